@@ -13,6 +13,12 @@ class ManageHash(private val scriptFolder : String, private val indicator: Progr
     private var scriptNames = mutableListOf<String>()
     private var scriptHashes = mutableListOf<String>()
 
+    companion object {
+        // check_hash 의 이름: 파이썬 스크립트는 확장자 없이, 그 외 파일(규칙 DB 등)은 확장자까지 기록
+        fun scriptFileName(scriptName: String): String =
+            if (scriptName.contains('.')) scriptName else "$scriptName.py"
+    }
+
     fun getScriptNames(): MutableList<String> {
         val scripts = scriptNames
         return scripts
@@ -25,7 +31,7 @@ class ManageHash(private val scriptFolder : String, private val indicator: Progr
         MyConsoleLogger.logPrint("Comparing file hashes...")
 
         for (i in 0..scriptNames.size - 1) {
-            val fileName = scriptNames[i] + ".py"
+            val fileName = scriptFileName(scriptNames[i])
             val expectedHash = scriptHashes[i]
 
             val file = File(scriptFolder, fileName)
@@ -5,8 +5,7 @@ import io.JoJoonBalSsa.TaintBomb.toolWindow.MyConsoleLogger
 import io.JoJoonBalSsa.TaintBomb.toolWindow.MyConsoleViewer
 import io.JoJoonBalSsa.TaintBomb.settings.TaintBombSettings
 import kotlinx.html.B
-import java.io.*
-import java.util.concurrent.TimeUnit
+import java.io.IOException
 
 class ManageObfuscate(
     private val javaFilesPath: String,
@@ -14,23 +13,29 @@ class ManageObfuscate(
     private var tempFolder: String,
     manageHash: ManageHash,
     private val venvPath: String,
-    private val osName: String,
     private val indicator: ProgressIndicator
 ) {
     private val settings = TaintBombSettings.getInstance()
 
     companion object {
-        private const val OUTPUT_THREAD_TIMEOUT_MS = 5000L
-        private const val OUTPUT_THREAD_INTERRUPT_WAIT_MS = 1000L
-        private const val MAIN_SCRIPT_TIMEOUT_SECONDS = 60L
         private const val STEP_SIZE = 0.08
     }
 
     init {
         indicator.text = "Checking Java code syntax..."
         manageHash.compareFileHashes(0.25)
-        checkJavaSyntax(0.3)
-        executePythonScript()
+
+        // 모든 단계를 하나의 상주 파이썬 워커에서 실행 (임포트와 파싱 결과 공유)
+        val worker = try {
+            PythonWorker(venvPath, tempFolder) { indicator.isCanceled }
+        } catch (e: IOException) {
+            logAndPrint("An error occurred: ${e.message}")
+            throw e
+        }
+        worker.use {
+            checkJavaSyntax(worker, 0.3)
+            executePythonScript(worker)
+        }
     }
 
     private fun readJavaCode(path: String): String {
@@ -40,10 +45,11 @@ class ManageObfuscate(
             ?: throw IllegalArgumentException("Script not found: $path")
     }
 
-    private fun executePythonScript() {
+    private fun executePythonScript(worker: PythonWorker) {
         var currentFraction = 0.35
 
         executeOptionalScript(
+            worker,
             enabled = true, //settings.enableRemoveComments,
             scriptName = "removeComments",
             displayText = "Removing comments",
@@ -55,7 +61,7 @@ class ManageObfuscate(
         if (settings.enableStringEncryption) {
             indicator.text = "Encrypting strings..."
             logAndPrint("Encrypting strings...")
-            runStringObfuscate(currentFraction)
+            runStringObfuscate(worker, currentFraction)
             currentFraction += STEP_SIZE
         } else {
             logSkipped("string obfuscation")
@@ -63,24 +69,32 @@ class ManageObfuscate(
 
         indicator.text = "Analysing code..."
         logAndPrint("Analysing code...")
-        runAnalysisObfuscate(currentFraction)
+        runAnalysisObfuscate(worker, currentFraction)
         currentFraction += STEP_SIZE
 
         indicator.text = "Running differential obfuscating..."
         logAndPrint("Running differential obfuscating...")
-        runLevelObfuscate(currentFraction)
+        runLevelObfuscate(worker, currentFraction)
         currentFraction += STEP_SIZE
 
         executeOptionalScript(
+            worker,
             enabled = settings.enableIdentifierObfuscation,
             scriptName = "identifierObfuscate",
             displayText = "Identifier obfuscating",
             disabledMessage = "identifier obfuscation",
             currentFraction = currentFraction
         )
+
+        // 단계들은 워커 메모리의 프로젝트만 고치므로 마지막에 한 번 디스크에 씀
+        val exitCode = runStage(worker, "checkpoint", listOf(outputFolder))
+        if (exitCode != 0) {
+            logAndPrint("Failed to write obfuscated files (exit code $exitCode)")
+        }
     }
 
     private fun executeOptionalScript(
+        worker: PythonWorker,
         enabled: Boolean,
         scriptName: String,
         displayText: String,
@@ -90,15 +104,15 @@ class ManageObfuscate(
         if (enabled) {
             indicator.text = "$displayText..."
             logAndPrint("$displayText...")
-            runPythonScript(scriptName, currentFraction)
+            runPythonScript(worker, scriptName, currentFraction)
         } else {
             logSkipped(disabledMessage)
         }
     }
 
-    private fun checkJavaSyntax(fractionValue: Double) {
+    private fun checkJavaSyntax(worker: PythonWorker, fractionValue: Double) {
         indicator.fraction = fractionValue
-        val exitCode = runScript("checkJavaSyntax", javaFilesPath)
+        val exitCode = runStage(worker, "checkJavaSyntax", listOf(javaFilesPath))
 
         if (exitCode == 0) {
             logAndPrint("This code is supported")
@@ -114,157 +128,47 @@ class ManageObfuscate(
         }
     }
 
-    private fun runStringObfuscate(fractionValue: Double) {
+    private fun runStringObfuscate(worker: PythonWorker, fractionValue: Double) {
         indicator.fraction = fractionValue
 
-        try {
-            val stringDecryptJava = readJavaCode("stringDecrypt$osName.java")
-            val keyDecryptJava = readJavaCode("keyDecrypt$osName.java")
+        // JSON 으로 전달하므로 Windows 명령줄 따옴표 처리가 필요 없어 OS 와 상관없이 같은 소스를 사용
+        val stringDecryptJava = readJavaCode("stringDecrypt.java")
+        val keyDecryptJava = readJavaCode("keyDecrypt.java")
 
-            val scriptPath = "$tempFolder/stringObfuscate.py"
-            val args = listOf(venvPath, "-u", scriptPath, outputFolder, keyDecryptJava, stringDecryptJava)
-
-            executeProcess(args, "stringObfuscate", timeout = null)
-        } catch (e: InterruptedException) {
-            logAndPrint("Canceled by user")
-            throw e
-        } catch (e: IOException) {
-            logAndPrint("An error occurred: ${e.message}")
-            throw e
-        }
+        runStage(worker, "stringObfuscate", listOf(outputFolder, keyDecryptJava, stringDecryptJava))
     }
 
-    private fun runAnalysisObfuscate(fractionValue: Double) {
+    private fun runAnalysisObfuscate(worker: PythonWorker, fractionValue: Double) {
         indicator.fraction = fractionValue
-        val timeout = MAIN_SCRIPT_TIMEOUT_SECONDS
-
-        try {
-            val scriptPath = "$tempFolder/main.py"
-            val args = listOf(venvPath, "-u", scriptPath, outputFolder, settings.apiKey, settings.enableOperatorObfuscation.toString(), settings.enableMethodSplitting.toString(), settings.enableInsertDummyCode.toString())
+        val args = listOf(outputFolder, settings.apiKey, settings.enableOperatorObfuscation.toString(), settings.enableMethodSplitting.toString(), settings.enableInsertDummyCode.toString())
 
-            executeProcess(args, "main", timeout = null)
-        } catch (e: InterruptedException) {
-            logAndPrint("Canceled by user")
-            throw e
-        } catch (e: IOException) {
-            logAndPrint("An error occurred: ${e.message}")
-            throw e
-        }
+        runStage(worker, "main", args)
     }
 
-    private fun runLevelObfuscate(fractionValue: Double) {
+    private fun runLevelObfuscate(worker: PythonWorker, fractionValue: Double) {
         indicator.fraction = fractionValue
+        val args = listOf(outputFolder, settings.enableOperatorObfuscation.toString(), settings.enableMethodSplitting.toString(), settings.enableInsertDummyCode.toString())
 
-        try {
-            val scriptPath = "$tempFolder/levelObfuscate.py"
-            val args = listOf(venvPath, "-u", scriptPath, outputFolder, settings.enableOperatorObfuscation.toString(), settings.enableMethodSplitting.toString(), settings.enableInsertDummyCode.toString())
-
-            executeProcess(args, "levelObfuscate.py", timeout = null)
-        } catch (e: InterruptedException) {
-            logAndPrint("Canceled by user")
-            throw e
-        } catch (e: IOException) {
-            logAndPrint("An error occurred: ${e.message}")
-            throw e
-        }
+        runStage(worker, "levelObfuscate", args)
     }
 
-    private fun runPythonScript(scriptName: String, fractionValue: Double) {
+    private fun runPythonScript(worker: PythonWorker, scriptName: String, fractionValue: Double) {
         indicator.fraction = fractionValue
-        runScript(scriptName, outputFolder)
-    }
-
-    private fun runScript(scriptName: String, outFolder: String): Int {
-        val scriptPath = "$tempFolder/$scriptName.py"
-        val args = buildScriptArgs(scriptPath, outFolder, scriptName)
-        val timeout = if (scriptName == "main") MAIN_SCRIPT_TIMEOUT_SECONDS else null
-
-        return executeProcess(args, scriptName, timeout)
-    }
-
-    private fun buildScriptArgs(scriptPath: String, outFolder: String, scriptName: String): List<String> {
-        return listOf(venvPath, "-u", scriptPath, outFolder)
+        runStage(worker, scriptName, listOf(outputFolder))
     }
 
-    private fun executeProcess(
-        args: List<String>,
-        scriptName: String,
-        timeout: Long?
-    ): Int {
-        val process = ProcessBuilder(args)
-            .redirectErrorStream(true)
-            .start()
-
-        val outputThread = createOutputReaderThread(process, scriptName)
-        outputThread.start()
-
+    private fun runStage(worker: PythonWorker, scriptName: String, args: List<String>): Int {
         return try {
-            val exitCode = waitForProcess(process, timeout, scriptName)
-            waitForOutputThread(outputThread)
-            exitCode
+            worker.runStage(scriptName, args)
         } catch (e: InterruptedException) {
-            handleProcessInterruption(process, outputThread, "Canceled by user")
-            -1
+            logAndPrint("Canceled by user")
+            throw e
         } catch (e: IOException) {
-            handleProcessInterruption(process, outputThread, "An error occurred: ${e.message}")
-            -1
-        }
-    }
-
-    private fun createOutputReaderThread(process: Process, scriptName: String): Thread {
-        return Thread {
-            try {
-                BufferedReader(InputStreamReader(process.inputStream)).use { reader ->
-                    reader.lineSequence().forEach { line ->
-                        MyConsoleLogger.logPrint("$scriptName output: $line")
-                    }
-                }
-            } catch (e: IOException) {
-                MyConsoleLogger.logPrint("Error reading output from $scriptName: ${e.message}")
-            }
-        }
-    }
-
-    private fun waitForProcess(process: Process, timeout: Long?, scriptName: String): Int {
-        return if (timeout != null) {
-            val completed = process.waitFor(timeout, TimeUnit.SECONDS)
-            if (!completed) {
-                process.destroy()
-                if (process.isAlive) {
-                    process.destroyForcibly()
-                }
-                MyConsoleLogger.logPrint("$scriptName execution timed out.")
-                return -1
-            }
-            process.exitValue()
-        } else {
-            process.waitFor()
-            process.exitValue()
-        }
-    }
-
-    private fun waitForOutputThread(thread: Thread) {
-        try {
-            thread.join(OUTPUT_THREAD_TIMEOUT_MS)
-            if (thread.isAlive) {
-                MyConsoleLogger.logPrint("Output thread is still running after ${OUTPUT_THREAD_TIMEOUT_MS}ms. Interrupting...")
-                thread.interrupt()
-                thread.join(OUTPUT_THREAD_INTERRUPT_WAIT_MS)
-                if (thread.isAlive) {
-                    MyConsoleLogger.logPrint("Output thread could not be interrupted. It may be blocked.")
-                }
-            }
-        } catch (e: InterruptedException) {
-            MyConsoleLogger.logPrint("Interrupted while waiting for output thread to finish: ${e.message}")
+            logAndPrint("An error occurred: ${e.message}")
+            throw e
         }
     }
 
-    private fun handleProcessInterruption(process: Process, outputThread: Thread, message: String) {
-        logAndPrint(message)
-        process.destroy()
-        outputThread.interrupt()
-    }
-
     private fun logAndPrint(message: String) {
         MyConsoleViewer.println(message)
         MyConsoleLogger.logPrint(message)
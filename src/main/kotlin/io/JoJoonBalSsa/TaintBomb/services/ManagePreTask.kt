@@ -213,12 +213,13 @@ class ManagePreTask(private val javaFilesPath: String, private var outFolder : S
 
     private fun copyScript(scriptName : String) {
         // Try different possible paths for the script
+        val fileName = ManageHash.scriptFileName(scriptName)
         val possiblePaths = listOf(
-            "/pyscripts/$scriptName.py",
-            "/pyscripts/analysis/core/$scriptName.py",
-            "/pyscripts/analysis/data/$scriptName.py",
-            "/pyscripts/analysis/utils/$scriptName.py",
-            "/pyscripts/analysis/reporting/$scriptName.py"
+            "/pyscripts/$fileName",
+            "/pyscripts/analysis/core/$fileName",
+            "/pyscripts/analysis/data/$fileName",
+            "/pyscripts/analysis/utils/$fileName",
+            "/pyscripts/analysis/reporting/$fileName"
         )
 
         var scriptStream: InputStream? = null
@@ -235,7 +236,7 @@ class ManagePreTask(private val javaFilesPath: String, private var outFolder : S
         val scriptContent = scriptStream?.bufferedReader()?.use { it.readText() }
             ?: throw IllegalArgumentException("Script not found: $scriptName (tried paths: ${possiblePaths.joinToString(", ")})")
 
-        val scriptFile = File(tempFolder, "$scriptName.py").apply { createNewFile() }.toPath()
+        val scriptFile = File(tempFolder, fileName).apply { createNewFile() }.toPath()
         MyConsoleLogger.logPrint("$scriptFile (from $foundPath)")
 
         scriptContent.toByteArray().let { Files.write(scriptFile, it, StandardOpenOption.WRITE) }
@@ -0,0 +1,152 @@
+package io.JoJoonBalSsa.TaintBomb.services
+
+import com.google.gson.Gson
+import com.google.gson.JsonObject
+import com.google.gson.JsonParser
+import com.google.gson.JsonSyntaxException
+import io.JoJoonBalSsa.TaintBomb.toolWindow.MyConsoleLogger
+import java.io.*
+import java.nio.charset.StandardCharsets
+import java.util.concurrent.LinkedBlockingQueue
+import java.util.concurrent.TimeUnit
+
+// 상주 pipelineWorker.py 프로세스
+// 단계마다 stdin 으로 JSON 요청 한 줄을 보내고 stdout 의 log 이벤트들과 done 이벤트 하나를 받는다.
+// 인터프리터, 라이브러리 임포트, 파싱한 AST 를 한 번의 난독화 실행 동안 모든 단계가 공유한다.
+// stdout 은 별도 스레드에서 읽으므로 단계가 실행 중이어도 취소(인터럽트 또는 isCanceled)를 바로 알 수 있고,
+// 취소하면 남은 변경 사항을 쓰지 않고 프로세스를 강제 종료한다.
+class PythonWorker(
+    venvPath: String,
+    tempFolder: String,
+    private val isCanceled: () -> Boolean = { false }
+) : Closeable {
+    private val gson = Gson()
+    private val process = ProcessBuilder(venvPath, "-u", "$tempFolder/pipelineWorker.py")
+        .redirectErrorStream(true)
+        .start()
+    private val writer = BufferedWriter(OutputStreamWriter(process.outputStream, StandardCharsets.UTF_8))
+    private val lines = LinkedBlockingQueue<String>()
+    private val endOfOutput = String(CharArray(0))  // 출력이 끝났음을 알리는 값 (참조로 비교)
+    private var nextId = 0
+
+    @Volatile
+    private var canceled = false
+
+    init {
+        Thread(::readOutput, "TaintBomb Python worker output").apply {
+            isDaemon = true
+            start()
+        }
+    }
+
+    companion object {
+        private const val SHUTDOWN_TIMEOUT_SECONDS = 5L
+        private const val POLL_INTERVAL_MS = 100L
+    }
+
+    fun runStage(stage: String, args: List<String>): Int {
+        val id = ++nextId
+        send(mapOf("id" to id, "stage" to stage, "args" to args))
+
+        while (true) {
+            val line = nextLine(stage) ?: throw IOException("Python worker exited while running $stage")
+            val message = parseMessage(line)
+
+            if (message == null) {
+                MyConsoleLogger.logPrint("$stage output: $line")
+                continue
+            }
+
+            when (message.get("event")?.asString) {
+                "log" -> MyConsoleLogger.logPrint("$stage output: ${message.get("line")?.asString ?: ""}")
+                "done" -> {
+                    message.get("error")?.let { MyConsoleLogger.logPrint("$stage error: ${it.asString}") }
+                    return message.get("exitCode")?.asInt ?: -1
+                }
+            }
+        }
+    }
+
+    // 다음 출력 줄 (프로세스가 끝나면 null), 기다리는 동안 취소되면 프로세스를 종료하고 InterruptedException
+    private fun nextLine(stage: String): String? {
+        try {
+            while (true) {
+                if (Thread.currentThread().isInterrupted || isCanceled()) {
+                    throw InterruptedException("$stage interrupted")
+                }
+                val line = lines.poll(POLL_INTERVAL_MS, TimeUnit.MILLISECONDS) ?: continue
+                return if (line === endOfOutput) null else line
+            }
+        } catch (e: InterruptedException) {
+            cancel()
+            throw e
+        }
+    }
+
+    private fun readOutput() {
+        try {
+            BufferedReader(InputStreamReader(process.inputStream, StandardCharsets.UTF_8)).use { reader ->
+                reader.lineSequence().forEach { lines.put(it) }
+            }
+        } catch (e: IOException) {
+            if (!canceled) {
+                MyConsoleLogger.logPrint("Error reading output from Python worker: ${e.message}")
+            }
+        } finally {
+            lines.put(endOfOutput)
+        }
+    }
+
+    private fun cancel() {
+        canceled = true
+        process.destroyForcibly()
+    }
+
+    private fun send(request: Map<String, Any>) {
+        writer.write(gson.toJson(request))
+        writer.newLine()
+        writer.flush()
+    }
+
+    private fun parseMessage(line: String): JsonObject? {
+        if (!line.startsWith("{")) {
+            return null
+        }
+        return try {
+            JsonParser.parseString(line).asJsonObject
+        } catch (e: JsonSyntaxException) {
+            null
+        } catch (e: IllegalStateException) {
+            null
+        }
+    }
+
+    override fun close() {
+        // 취소된 실행은 shutdown(= checkpoint) 을 보내지 않는다. 반쯤 난독화된 프로젝트를 디스크에 쓰지 않도록
+        if (canceled || isCanceled() || Thread.currentThread().isInterrupted) {
+            cancel()
+            return
+        }
+
+        try {
+            if (process.isAlive) {
+                send(mapOf("id" to ++nextId, "stage" to "shutdown"))
+                while (true) {
+                    val line = nextLine("shutdown") ?: break
+                    if (parseMessage(line) == null) {
+                        MyConsoleLogger.logPrint("worker output: $line")
+                    }
+                }
+            }
+        } catch (e: IOException) {
+            MyConsoleLogger.logPrint("Error while stopping Python worker: ${e.message}")
+        } catch (e: InterruptedException) {
+            MyConsoleLogger.logPrint("Python worker stopped: ${e.message}")
+            Thread.currentThread().interrupt()
+        } finally {
+            if (!canceled && !process.waitFor(SHUTDOWN_TIMEOUT_SECONDS, TimeUnit.SECONDS)) {
+                process.destroyForcibly()
+            }
+        }
+    }
+}
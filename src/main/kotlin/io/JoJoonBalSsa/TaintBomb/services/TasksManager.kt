@@ -20,7 +20,7 @@ class TasksManager(private val project : Project, private val javaFilesPath: Str
         val manageBuild = ManageBuild(javaFilesPath, outFolder, indicator)
         val buildManager = manageBuild.checkBuildManager()
 
-        ManageObfuscate(javaFilesPath, outFolder, tempFolder, manageHash, venvPath, preTask.getOS(), indicator)
+        ManageObfuscate(javaFilesPath, outFolder, tempFolder, manageHash, venvPath, indicator)
         manageBuild.runBuildManager(0.8, buildManager)
 
         openFileInEditorAsync(project, outFolder, "/analysis_result.md")
@@ -0,0 +1,43 @@
+import java.util.Base64;
+import javax.crypto.Cipher;
+import javax.crypto.spec.SecretKeySpec;
+
+public static String stringDecrypt(String encryptedText, byte[] key) {
+    try {
+        return stringDecrypt(stringCipher(key), encryptedText);
+    } catch (Exception e) {
+        throw new RuntimeException("Decryption failed", e);
+    }
+}
+
+public static void stringDecryptAll(String[] encryptedTexts, byte[] key) {
+    try {
+        Cipher cipher = stringCipher(key);
+        for (int i = 0; i < encryptedTexts.length; i++) {
+            encryptedTexts[i] = stringDecrypt(cipher, encryptedTexts[i]);
+        }
+    } catch (Exception e) {
+        throw new RuntimeException("Decryption failed", e);
+    }
+}
+
+private static Cipher stringCipher(byte[] key) throws Exception {
+    SecretKeySpec secretKey = new SecretKeySpec(key, "AES");
+    Cipher cipher = Cipher.getInstance("AES/ECB/PKCS5Padding");
+    cipher.init(Cipher.DECRYPT_MODE, secretKey);
+    return cipher;
+}
+
+private static String stringDecrypt(Cipher cipher, String encryptedText) throws Exception {
+    byte[] decryptedBytes = cipher.doFinal(Base64.getDecoder().decode(encryptedText));
+    String decrypted_str = new String(decryptedBytes, "UTF-8")
+            .replace("\\n", "\n")
+            .replace("\\t", "\t")
+            .replace("\\r", "\r")
+            .replace("\\b", "\b")
+            .replace("\\f", "\f")
+            .replace("\\\"", "\"")
+            .replace("\\'", "'")
+            .replace("\\\\", "\\");
+    return decrypted_str.substring(1, decrypted_str.length() - 1);
+}
@@ -1,48 +1,57 @@
 import javalang
-import os
 import logging
 
+from parallelParser import parse_java_folder
+
 
 class ASTParser:
     """Java 파일 AST 파싱을 담당하는 클래스"""
 
-    def __init__(self):
+    def __init__(self, workers=None):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
+        self.workers = workers  # None 이면 parallelParser 기본값 (CPU 수)
+
+    def parse_java_files(self, folder_path, project=None):
+        """주어진 폴더의 모든 Java 파일을 파싱하여 파일 경로, 소스 코드, AST를 반환
 
-    def parse_java_files(self, folder_path):
-        """주어진 폴더의 모든 Java 파일을 파싱하여 파일 경로, 소스 코드, AST를 반환"""
+        project 가 주어지면 디스크 대신 메모리의 Project 에 있는 소스를 사용
+        """
         trees = []
         source_codes = {}
         error_files = []
         success_files = []
         total_files = 0
 
-        for root, _, files in os.walk(folder_path):
-            for file_name in files:
-                if file_name.endswith('.java'):
-                    total_files += 1
-                    file_path = os.path.join(root, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as file:
-                            source_code = file.read()
-                        tree = javalang.parse.parse(source_code)
-                        trees.append((file_path, tree))
-                        source_codes[file_path] = source_code  # 파일 경로와 소스 코드를 딕셔너리에 저장
-                        success_files.append(file_path)
-                        self.logger.info(f"파싱 성공: {file_path}")
-                    except SyntaxError as e:  # 문법 오류는 파이썬의 SyntaxError로 처리
-                        print(f"Syntax error in file {file_path}: {e}")
-
-                    except javalang.parser.JavaSyntaxError as e:
-                        error_message = f"문법 오류 발생 in {file_path}: {str(e)}"
-                        self.logger.error(error_message)
-                        error_files.append((file_path, str(e)))
-
-                    except javalang.parser.JavaParserError as e:
-                        error_message = f"파싱 오류 발생 in {file_path}: {str(e)}"
-                        self.logger.error(error_message)
-                        error_files.append((file_path, str(e)))
+        if project is not None:
+            parsed = ((unit.path, unit.source, unit.tree, unit.error) for unit in project.units)
+        else:
+            parsed = parse_java_folder(folder_path, self.workers)
+
+        for file_path, source_code, tree, error in parsed:
+            total_files += 1
+
+            if error is None:
+                trees.append((file_path, tree))
+                source_codes[file_path] = source_code  # 파일 경로와 소스 코드를 딕셔너리에 저장
+                success_files.append(file_path)
+                self.logger.info(f"파싱 성공: {file_path}")
+
+            elif isinstance(error, SyntaxError):  # 문법 오류는 파이썬의 SyntaxError로 처리
+                print(f"Syntax error in file {file_path}: {error}")
+
+            elif isinstance(error, javalang.parser.JavaSyntaxError):
+                error_message = f"문법 오류 발생 in {file_path}: {str(error)}"
+                self.logger.error(error_message)
+                error_files.append((file_path, str(error)))
+
+            elif isinstance(error, javalang.parser.JavaParserError):
+                error_message = f"파싱 오류 발생 in {file_path}: {str(error)}"
+                self.logger.error(error_message)
+                error_files.append((file_path, str(error)))
+
+            else:
+                raise error
 
         self.logger.info(f"총 {total_files}개의 파일 중 {len(success_files)}개 파싱 성공, {len(error_files)}개 파싱 실패")
 
@@ -51,4 +60,4 @@ class ASTParser:
             for file_path, error in error_files:
                 self.logger.error(f"  - {file_path}: {error}")
 
-        return trees, source_codes  # 소스 코드와 AST를 함께 반환
\ No newline at end of file
+        return trees, source_codes  # 소스 코드와 AST를 함께 반환
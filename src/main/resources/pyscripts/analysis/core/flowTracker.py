@@ -1,37 +1,275 @@
+import heapq
 import javalang
 import logging
-import inspect
-from collections import defaultdict
-from sensitivityDB import SensitivityDB as S
+import os
+from concurrent.futures import ProcessPoolExecutor
+from sensitivityDB import RuleDB
+from methodIndex import MethodIndex, MethodNodeIndex, declared_types, qualifier_candidates
+from analysisState import SeedRecord
+from flowStore import FlowStore, FlowMap
+
+
+DEFAULT_MAX_DEPTH = int(os.environ.get('TAINTBOMB_FLOW_MAX_DEPTH', '8'))  # seed 메서드를 1 로 셀 때 따라갈 최대 호출/할당 깊이
+DEFAULT_MAX_STATES = int(os.environ.get('TAINTBOMB_FLOW_MAX_STATES', '100000'))  # seed 하나에서 탐색할 최대 상태 수
+DEFAULT_WORKERS = int(os.environ.get('TAINTBOMB_FLOW_WORKERS', '0')) or (os.cpu_count() or 1)
+DEFAULT_CHUNK_SIZE = int(os.environ.get('TAINTBOMB_FLOW_CHUNK', '16'))
+MIN_PARALLEL_SEEDS = 64  # 이보다 적으면 프로세스에 메소드 테이블을 넘기는 비용이 더 큼
+
+
+class _Frame:
+    """작업 스택의 항목: (class_method, var_name, count) 상태 하나와 노드 순회 위치"""
+
+    __slots__ = ('class_method', 'var_name', 'count', 'depth', 'path', 'nodes', 'summary')
+
+    def __init__(self, class_method, var_name, count, depth, path):
+        self.class_method = class_method
+        self.var_name = var_name
+        self.count = count
+        self.depth = depth
+        self.path = path  # 이 상태까지의 흐름 노드 (시작 전에는 부모의 흐름)
+        self.nodes = None  # 시작한 뒤에는 (current_count, node) 이터레이터
+        self.summary = None  # 메서드 진입 상태면 만들고 있는 _Summary
+
+
+class _Summary:
+    """메서드 진입 상태 (class_method, 매개변수) 에서 도달하는 sink 목록"""
+
+    __slots__ = ('budget', 'prefix_length', 'depth', 'serial', 'sinks', 'complete', 'depends_on')
+
+    def __init__(self, budget, prefix_length, depth, serial):
+        self.budget = budget  # 만들 때 남아 있던 깊이 (남은 깊이가 이 이하인 호출 지점에서만 재사용)
+        self.prefix_length = prefix_length  # 흐름의 앞 부분 중 진입 메서드를 호출한 경로의 길이
+        self.depth = depth
+        self.serial = serial
+        self.sinks = []  # (키, sink 멤버, sink 민감도, 로그 메시지, 흐름 노드, 진입 상태로부터의 상대 깊이)
+        self.complete = True
+        self.depends_on = set()  # 만드는 동안 조회한 (클래스, 메소드 이름)들 (증분 분석의 무효화 판단용)
+
+    def with_sinks(self, sinks, prefix_length):
+        """sinks 를 바꾼 복사본 (흐름 노드와 문자열 튜플을 서로 바꿀 때)"""
+        summary = _Summary(self.budget, prefix_length, self.depth, self.serial)
+        summary.sinks, summary.complete, summary.depends_on = sinks, self.complete, self.depends_on
+        return summary
 
 
 class FlowTracker:
-    """변수 흐름을 추적하는 클래스"""
+    """변수 흐름을 추적하는 클래스 (명시적인 스택으로 깊이 우선 탐색, seed 마다 독립적으로 추적해서 seed 순서대로 합침)"""
 
-    def __init__(self, methods, source_codes):
+    def __init__(self, methods, source_codes, max_depth=DEFAULT_MAX_DEPTH, max_states=DEFAULT_MAX_STATES,
+                 method_index=None, method_nodes=None, seed_results=None, summaries=None, rules=None, field_types=None):
         self.methods = methods
+        self.rules = rules if rules is not None else RuleDB.load()
+        self.field_types = field_types if field_types is not None else {}  # 클래스 -> {필드 이름: 선언 타입}
+        self._declared_types = {}  # id(메소드 노드) -> declared_types() 결과
+        self.method_index = method_index if method_index is not None else MethodIndex.from_methods(methods)
+        self.method_nodes = method_nodes if method_nodes is not None else {}  # 없는 메소드는 처음 볼 때 색인
         self.source_codes = source_codes
-        self.flows = defaultdict(list)
-        self.flow = []
+        self.max_depth = max_depth
+        self.max_states = max_states
+        self.store = FlowStore()
+        self.flows = FlowMap(self.store)
+        self.flow = FlowStore.ROOT
         self.sink_check = []
-
-    def track_all_flows(self, tainted_variables):
-        """모든 taint된 변수의 흐름을 추적"""
-        for class_method, var, count in tainted_variables:
-            self.flow.clear()
-            self._track_variable_flow(class_method, var, count)
+        self.sensitivities = {}  # flows 의 키 -> 흐름의 민감도 (seed 와 sink 에서 찾은 규칙의 민감도 중 큰 값)
+        self.summaries = {key: self._import_summary(summary) for key, summary in (summaries or {}).items()}
+        # (class_method, 매개변수) -> _Summary
+        self.seed_results = {seed: self._import_record(record) for seed, record in (seed_results or {}).items()}
+        # seed -> SeedRecord (예산을 넘겨 중단된 seed 는 제외)
+        self._children = []  # 현재 노드에서 새로 추적할 상태들
+        self._open_summaries = []  # 스택에 있는 진입 상태들의 요약 (바깥쪽부터)
+        self._depends_on = None  # 추적 중인 seed 가 조회한 (클래스, 메소드 이름)들
+        self._seed_sinks = None  # 추적 중인 seed 가 기록한 sink 들
+
+    def track_all_flows(self, tainted_variables, workers=None):
+        """모든 taint된 변수의 흐름을 추적 (결과가 있는 seed 는 그 결과를 같은 순서로 다시 기록)"""
+        pending = list(dict.fromkeys(seed for seed in tainted_variables if seed not in self.seed_results))
+        records = self._track_seeds(pending, DEFAULT_WORKERS if workers is None else workers)
+
+        for seed in tainted_variables:
+            record = self.seed_results.get(seed) or records[seed]
+            source_sensitivity = seed[3]
+            for key, member, sensitivity, log_message, flow in record.sinks:
+                self._merge_sink(key, member, max(source_sensitivity, sensitivity), log_message, flow)
+
+    def _track_seeds(self, seeds, workers):
+        """seed 들을 각각 독립적으로 추적해서 {seed: SeedRecord} 반환 (중단되지 않은 것은 seed_results 에도 저장)"""
+        if workers <= 1 or len(seeds) < MIN_PARALLEL_SEEDS:
+            results = [(seed,) + self._track_seed(seed) for seed in seeds]
+        else:
+            results = []
+            chunks = [seeds[i:i + DEFAULT_CHUNK_SIZE] for i in range(0, len(seeds), DEFAULT_CHUNK_SIZE)]
+            initargs = (self.methods, self.method_index, self.max_depth, self.max_states, self.portable_summaries(),
+                        self.rules, self.field_types)
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                     initargs=initargs) as executor:
+                for chunk_results, summaries in executor.map(_track_chunk, chunks):  # map 은 제출 순서대로 돌려준다
+                    results.extend((seed, self._import_record(record), completed)
+                                   for seed, record, completed in chunk_results)
+                    for key, summary in summaries.items():
+                        if key not in self.summaries:
+                            self.summaries[key] = self._import_summary(summary)
+
+        records = {}
+        for seed, record, completed in results:
+            records[seed] = record
+            if completed:
+                self.seed_results[seed] = record
+        return records
+
+    def _track_seed(self, seed):
+        """seed 하나를 추적해서 (SeedRecord, 상태 예산 안에 끝났는지) 반환"""
+        self._depends_on, self._seed_sinks = set(), []
+        try:
+            completed = self._track_variable_flow(*seed[:3])
+            return SeedRecord(frozenset(self._depends_on), self._seed_sinks), completed
+        finally:
+            self._depends_on, self._seed_sinks = None, None
+
+    def portable_seed_results(self, seeds):
+        """seeds 의 추적 결과를 흐름 노드 대신 문자열 튜플로 (다른 프로세스나 다음 분석에 넘길 때)"""
+        return {seed: self._export_record(self.seed_results[seed]) for seed in seeds if seed in self.seed_results}
+
+    def portable_summaries(self):
+        """메서드 요약들을 흐름 노드 대신 문자열 튜플로"""
+        return {key: self._export_summary(summary) for key, summary in self.summaries.items()}
+
+    def _export_summary(self, summary):
+        """흐름은 진입 메서드부터의 문자열 튜플로"""
+        return summary.with_sinks([(key, member, sensitivity, log_message,
+                                    tuple(self.store.labels(flow, summary.prefix_length)), relative_depth)
+                                   for key, member, sensitivity, log_message, flow, relative_depth in summary.sinks], 0)
+
+    def _import_summary(self, summary):
+        return summary.with_sinks([(key, member, sensitivity, log_message,
+                                    self.store.extend(FlowStore.ROOT, sub_flow), relative_depth)
+                                   for key, member, sensitivity, log_message, sub_flow, relative_depth in summary.sinks], 0)
+
+    def _export_record(self, record):
+        return SeedRecord(record.depends_on, [(key, member, sensitivity, log_message, tuple(self.store.labels(flow)))
+                                              for key, member, sensitivity, log_message, flow in record.sinks])
+
+    def _import_record(self, record):
+        return SeedRecord(record.depends_on, [(key, member, sensitivity, log_message,
+                                               self.store.extend(FlowStore.ROOT, flow))
+                                              for key, member, sensitivity, log_message, flow in record.sinks])
 
     def _track_variable_flow(self, class_method, var_name, count=0):
-        """변수 흐름 추적 (계속 추가 가능)"""
-        MAX_RECURSION_DEPTH = 20  # 재귀 호출 최대 깊이 설정
-
-        # 현재 재귀 깊이를 가져옴
-        current_recursion_depth = len(inspect.stack())
+        """seed 하나에서 시작하는 변수 흐름 추적 (계속 추가 가능), 상태 예산을 넘겨 중단되면 False"""
+        visited = {}  # 상태 -> (탐색했던 가장 얕은 깊이, 탐색 순번)
+        stack = [_Frame(class_method, var_name, count, 1, FlowStore.ROOT)]
+        explored = 0
+        completed = True
+
+        while stack:
+            frame = stack[-1]
+
+            if frame.nodes is None:  # 새 상태 시작
+                if frame.depth > self.max_depth or self._replay_summary(frame):
+                    stack.pop()
+                    continue
 
-        # 재귀 깊이가 MAX_RECURSION_DEPTH 이상이면 종료
-        if current_recursion_depth >= MAX_RECURSION_DEPTH:
+                state = (frame.class_method, frame.var_name, frame.count)
+                seen_depth, seen_serial = visited.get(state, (self.max_depth + 1, 0))
+                if seen_depth <= frame.depth:
+                    self._skip_explored(seen_serial)
+                    stack.pop()
+                    continue
+                if explored >= self.max_states:
+                    logging.warning(f"state budget exceeded ({self.max_states}): {class_method} {var_name}")
+                    completed = False
+                    break
+
+                explored += 1
+                visited[state] = (frame.depth, explored)
+                if frame.count == 0:
+                    frame.summary = _Summary(self.max_depth - frame.depth, self.store.depth(frame.path), frame.depth,
+                                             explored)
+                    self._open_summaries.append(frame.summary)
+                frame.path = self.store.child(frame.path, frame.class_method)  # 흐름 추가
+                frame.nodes = self._iter_method_nodes(frame.class_method, frame.var_name, frame.count)
+
+            step = next(frame.nodes, None)
+            if step is None:
+                self._close_summary(frame)
+                stack.pop()
+                continue
+
+            current_count, node = step
+            self.flow = frame.path
+            self._visit_node(node, frame.class_method, frame.var_name, frame.count, current_count)
+
+            # 재귀 호출 순서와 같도록 먼저 생긴 상태가 스택 맨 위에 오게 넣음
+            children, self._children = self._children, []
+            for child_class_method, child_var, child_count in reversed(children):
+                stack.append(_Frame(child_class_method, child_var, child_count, frame.depth + 1, frame.path))
+
+        self._open_summaries.clear()  # 예산 초과로 끝나면 만들던 요약은 버림
+        self.flow = FlowStore.ROOT
+        return completed
+
+    def _replay_summary(self, frame):
+        """재사용할 수 있는 요약이 있으면 그 sink 들을 현재 흐름 뒤에 붙여 기록하고 True"""
+        if frame.count != 0:
+            return False
+        summary = self.summaries.get((frame.class_method, frame.var_name))
+        remaining = self.max_depth - frame.depth
+        if summary is None or summary.budget < remaining:
+            return False
+
+        self._depend(*summary.depends_on)
+        for key, member, sensitivity, log_message, flow, relative_depth in summary.sinks:
+            if relative_depth <= remaining:
+                self._record_sink(key, member, sensitivity, log_message,
+                                  self.store.concat(frame.path, flow, summary.prefix_length))
+        return True
+
+    def _depend(self, *methods):
+        """추적 결과가 이 (클래스, 메소드 이름)들의 선언에 의존함을 기록 (클래스가 None 이면 그 이름의 모든 메소드)"""
+        if self._depends_on is not None:
+            self._depends_on.update(methods)
+        for summary in self._open_summaries:
+            summary.depends_on.update(methods)
+
+    def _skip_explored(self, seen_serial):
+        """이미 탐색한 상태를 건너뛸 때, 그 상태를 요약 바깥에서 탐색했다면 요약이 불완전해짐"""
+        for summary in reversed(self._open_summaries):
+            if summary.serial <= seen_serial:
+                break
+            summary.complete = False
+
+    def _close_summary(self, frame):
+        if frame.summary is None:
             return
-
+        self._open_summaries.pop()
+        if frame.summary.complete:
+            self.summaries[(frame.class_method, frame.var_name)] = frame.summary
+        elif self._open_summaries:  # 안쪽 요약이 불완전하면 바깥 요약도 불완전
+            self._open_summaries[-1].complete = False
+
+    def _record_sink(self, key, member, sensitivity, log_message, flow):
+        """추적 중인 seed 가 sink 에 도달한 흐름 하나를 기록하고, 탐색 중인 진입 상태들의 요약에도 추가"""
+        key, log_message = self.store.intern(key), self.store.intern(log_message)
+        self._seed_sinks.append((key, member, sensitivity, log_message, flow))
+
+        sink_depth = self.store.depth(flow) - 1  # 흐름은 상태마다 하나씩, 마지막은 sink
+        for summary in self._open_summaries:
+            summary.sinks.append((key, member, sensitivity, log_message, flow, sink_depth - summary.depth))
+
+    def _merge_sink(self, key, member, sensitivity, log_message, flow):
+        """seed 의 sink 하나를 flows 에 추가 (이미 있는 키면 번호를 붙인 새 키를 사용)"""
+        logging.info(log_message)
+        self.sink_check.append(member)
+        # 새로운 키를 생성하고, 기존 키가 존재하면 새 키를 사용
+        new_key = self._numbering(self.flows, key)
+        self.flows.add(new_key, flow)
+        self.sensitivities[new_key] = sensitivity
+
+    def _enqueue(self, class_method, var_name, count=0):
+        """현재 노드에서 이어서 추적할 상태 등록 (노드 처리가 끝나면 스택에 들어감)"""
+        self._children.append((class_method, var_name, count))
+
+    def _iter_method_nodes(self, class_method, var_name, count):
+        """메소드에서 count 이후에 var_name 을 참조하는 관련 노드들만 (current_count, node) 로 반환"""
         parts = class_method.split('.')
         class_name = parts[0]
 
@@ -39,47 +277,47 @@ class FlowTracker:
             parts[1] = " "
 
         method_name = parts[1]
-        self.flow.append(class_method)  # 흐름 추가
-        method_nodes = self.methods.get((class_name, method_name), [])  # 메서드 단위로 저장해둔 노드로 바로 접근 가능
-
-        current_count = 0
-        for file_path, method_node in method_nodes:
-            for path, node in method_node:  # 노드 내부 탐색
-                current_count += 1
-
-                if current_count <= count:
-                    continue
-
-                # sink 탐색
-                if isinstance(node, javalang.tree.MethodInvocation):
-                    self._if_find_sink(node, class_method, var_name, count, current_count)
+        return self._method_node_index((class_name, method_name)).nodes_after(var_name, count)
+
+    def _method_node_index(self, key):
+        self._depend(key)
+        index = self.method_nodes.get(key)
+        if index is None:
+            index = MethodNodeIndex()
+            for file_path, method_node in self.methods.get(key, []):  # 메서드 단위로 저장해둔 노드로 바로 접근 가능
+                for _ in index.add(method_node):
+                    pass
+            self.method_nodes[key] = index
+        return index
 
-                # 변수 할당일 때
-                if isinstance(node, javalang.tree.Assignment):
-                    self._if_variable_assignment(node, class_method, var_name, count, current_count)
+    def _visit_node(self, node, class_method, var_name, count, current_count):
+        # sink 탐색
+        if isinstance(node, javalang.tree.MethodInvocation):
+            self._if_find_sink(node, class_method, var_name, count, current_count)
 
-                # 지역변수 선언일 때
-                elif isinstance(node, javalang.tree.LocalVariableDeclaration):
-                    self._if_local_variable_declaration(node, class_method, var_name, count, current_count)
+        # 변수 할당일 때
+        if isinstance(node, javalang.tree.Assignment):
+            self._if_variable_assignment(node, class_method, var_name, count, current_count)
 
-                # 메서드 호출일 때
-                elif isinstance(node, javalang.tree.MethodInvocation):
-                    self._if_call_method(node, var_name, count, current_count)
+        # 지역변수 선언일 때
+        elif isinstance(node, javalang.tree.LocalVariableDeclaration):
+            self._if_local_variable_declaration(node, class_method, var_name, count, current_count)
 
-                # for 문일 때
-                elif isinstance(node, javalang.tree.ForStatement):
-                    self._if_for_statement(node, class_method, var_name, count, current_count)
+        # 메서드 호출일 때
+        elif isinstance(node, javalang.tree.MethodInvocation):
+            self._if_call_method(node, class_method, var_name, count, current_count)
 
-                # try 문일 때
-                elif isinstance(node, javalang.tree.TryResource):
-                    self._if_try(node, class_method, var_name, count, current_count)
+        # for 문일 때
+        elif isinstance(node, javalang.tree.ForStatement):
+            self._if_for_statement(node, class_method, var_name, count, current_count)
 
-                # 삼항연산자 일 때
-                elif isinstance(node, javalang.tree.TernaryExpression):
-                    self._if_ternary(node, class_method, var_name, count, current_count)
+        # try 문일 때
+        elif isinstance(node, javalang.tree.TryResource):
+            self._if_try(node, class_method, var_name, count, current_count)
 
-        if self.flow:
-            self.flow.pop()
+        # 삼항연산자 일 때
+        elif isinstance(node, javalang.tree.TernaryExpression):
+            self._if_ternary(node, class_method, var_name, count, current_count)
 
     def _if_find_sink(self, node, class_method, var_name, count, current_count):
         parts = class_method.split('.')
@@ -89,7 +327,10 @@ class FlowTracker:
         if current_count <= count:
             return
 
-        if node.member in S.sink_functions.keys() and node.arguments:
+        sensitivity = 0
+        if node.member in self.rules.sinks and node.arguments:
+            sensitivity = self._sink_sensitivity(node, class_name, method_name, current_count)
+        if sensitivity > 0:
             flow_added = False
 
             for arg in node.arguments:
@@ -105,18 +346,21 @@ class FlowTracker:
                         break
 
             if flow_added:
-                self.flow.append(f"{class_name}.{method_name}.{node.member}")
                 log_message = f".{method_name}.{node.qualifier}.{node.member}"
-                logging.info(log_message)
-                self.sink_check.append(node.member)
-                # 새로운 키를 생성하고, 기존 키가 존재하면 새 키를 사용
-                existing_key = (class_method, var_name)
-                new_key = self._numbering(self.flows, existing_key, node)
-                if new_key not in self.flows:
-                    self.flows[new_key] = []
-                # flows에 flow 복사
-                self.flows[new_key].append(self.flow[:])
-                self.flow.pop()
+                # 현재 흐름 뒤에 sink 를 붙인 흐름 기록
+                self._record_sink((class_method, var_name), node.member, sensitivity, log_message,
+                                  self.store.child(self.flow, f"{class_name}.{method_name}.{node.member}"))
+
+    def _sink_sensitivity(self, node, class_name, method_name, current_count):
+        """호출에 맞는 규칙 DB 의 sink 규칙의 민감도, sink 가 아니면 0 (qualifier 조건이 있는 규칙만 변수 타입을 찾음)"""
+        qualifiers = ()
+        if node.qualifier and self.rules.needs_qualifier(node.member, 'sinks'):
+            method_node = self._method_node_index((class_name, method_name)).method_at(current_count)
+            types = self._declared_types.get(id(method_node))
+            if types is None:
+                types = self._declared_types[id(method_node)] = declared_types(method_node) if method_node else {}
+            qualifiers = qualifier_candidates(node.qualifier, types, self.field_types.get(class_name))
+        return self.rules.sink(node.member, qualifiers, len(node.arguments))
 
     def _judge_binary_operation(self, arg, flow_added, var_name):
         try:
@@ -163,14 +407,14 @@ class FlowTracker:
                         if isinstance(arg, javalang.tree.MemberReference) and arg.member == var_name and (count < current_count):
                             expression_member = getattr(node, 'expressionl', None)
                             if expression_member and hasattr(expression_member, 'member'):
-                                self._track_variable_flow(class_method, expression_member.member, current_count)  # 같은 메서드에서 추적
+                                self._enqueue(class_method, expression_member.member, current_count)  # 같은 메서드에서 추적
 
             if isinstance(node.value, javalang.tree.MethodInvocation) and (getattr(node.value, 'qualifier', None) == var_name) and (count < current_count):
-                self._track_variable_flow(class_method, getattr(node, 'expressionl', None).member, current_count)  # 같은 메서드에서 추적
+                self._enqueue(class_method, getattr(node, 'expressionl', None).member, current_count)  # 같은 메서드에서 추적
 
             # MemberReference 처리
             if isinstance(node.expressionl, javalang.tree.MemberReference) and (getattr(node.value, 'member', None) == var_name) and (count < current_count):  # 1-1
-                self._track_variable_flow(class_method, getattr(node, 'expressionl', None).member, current_count)
+                self._enqueue(class_method, getattr(node, 'expressionl', None).member, current_count)
 
             if isinstance(node.expressionl, javalang.tree.MemberReference) and (getattr(node.expressionl, 'member', None) == var_name) and (count < current_count):  # 1-2
                 if count < current_count:
@@ -194,33 +438,35 @@ class FlowTracker:
                         if var_decl.initializer.arguments:
                             for arg in var_decl.initializer.arguments:
                                 if isinstance(arg, javalang.tree.MemberReference) and arg.member == var_name and count < current_count:
-                                    self._track_variable_flow(class_method, var_decl.name, current_count)  # 같은 메서드에서 추적
+                                    self._enqueue(class_method, var_decl.name, current_count)  # 같은 메서드에서 추적
                 except Exception:  # MethodInvocation 내부 예외 처리
                     pass
 
                 try:
                     if isinstance(var_decl.initializer, javalang.tree.MethodInvocation):
                         if var_decl.initializer.qualifier == var_name and count < current_count:  # 2-1
-                            self._track_variable_flow(class_method, var_decl.name, current_count)  # 같은 메서드에서 추적
+                            self._enqueue(class_method, var_decl.name, current_count)  # 같은 메서드에서 추적
                 except Exception:  # MethodInvocation 예외 처리
                     pass
 
                 try:
                     if isinstance(var_decl.initializer, javalang.tree.MemberReference) and var_decl.initializer.member == var_name and count < current_count:  # 1-1
-                        self._track_variable_flow(class_method, var_decl.name, current_count)
+                        self._enqueue(class_method, var_decl.name, current_count)
                 except Exception:  # MemberReference 예외 처리
                     pass
         except Exception:  # node.declarators 처리에서 발생하는 예외를 전체적으로 잡음
             pass
 
-    def _if_call_method(self, node, var_name, count, current_count):
+    def _if_call_method(self, node, class_method, var_name, count, current_count):
         if node.arguments:
             for arg_index, arg in enumerate(node.arguments):
                 if isinstance(arg, javalang.tree.MemberReference):
                     if arg.member == var_name and (count < current_count):  # 4-1
-                        class_method_2, var_name_2 = self._call2method(node, arg_index)
+                        class_name, method_name = class_method.split('.')[:2]
+                        owner = self._method_node_index((class_name, method_name)).selector_owners.get(id(node))
+                        class_method_2, var_name_2 = self._call2method(node, arg_index, class_name, owner)
                         var_name_2 = var_name if var_name_2 == None else var_name_2  # 소스코드에 없는 메서드 호출시 var_name_2 가 None 이 되는경우 방지
-                        self._track_variable_flow(class_method_2, var_name_2)
+                        self._enqueue(class_method_2, var_name_2)
 
                 elif isinstance(arg, javalang.tree.BinaryOperation):
                     self._process_binary_operation(arg, node, var_name, count, current_count)
@@ -231,24 +477,27 @@ class FlowTracker:
             self._process_binary_operation(binary_op.operandl, node, var_name, count, current_count)
         elif isinstance(binary_op.operandl, javalang.tree.MemberReference):
             if binary_op.operandl.member == var_name:
-                self._track_variable_flow(f"{type(node).__name__}.{node.member}", binary_op.operandl.member)
+                self._enqueue(f"{type(node).__name__}.{node.member}", binary_op.operandl.member)
 
         if isinstance(binary_op.operandr, javalang.tree.BinaryOperation):
             self._process_binary_operation(binary_op.operandr, node, var_name, count, current_count)
 
         elif isinstance(binary_op.operandr, javalang.tree.MemberReference):
             if binary_op.operandr.member == var_name:
-                self._track_variable_flow(f"{type(node).__name__}.{node.member}", binary_op.operandr.member)
+                self._enqueue(f"{type(node).__name__}.{node.member}", binary_op.operandr.member)
 
-    def _call2method(self, node, arg_index):
+    def _call2method(self, node, arg_index, caller_class=None, owner=None):
         invoked_method = node.member
-        for target_class_method, target_method_nodes in self.methods.items():
-            target_class_name, target_method_name = target_class_method
-            if target_method_name == invoked_method:  # 문제: 메서드 이름은 같은데 클래스가 다르다면?
-                for target_file_path, target_method_node in target_method_nodes:
-                    if len(target_method_node.parameters) > arg_index:
-                        new_var_name = target_method_node.parameters[arg_index].name
-                        return f"{target_class_name}.{invoked_method}", new_var_name
+        # 선언 클래스(qualifier, this/new 또는 호출한 클래스)와 인자 개수로 오버로드를 구분
+        declaring_class = self.method_index.qualifier_class(node.qualifier, caller_class, owner)
+        target = self.method_index.resolve(invoked_method, len(node.arguments), declaring_class, arg_index)
+        if target is not None and target.class_name == declaring_class:
+            self._depend((declaring_class, invoked_method))  # 선언 클래스 안에서 찾음
+        else:
+            self._depend((None, invoked_method))  # 이름만으로 찾았거나 못 찾음: 어느 클래스의 선언이든 결과를 바꿀 수 있음
+        if target is not None:
+            new_var_name = target.node.parameters[arg_index].name
+            return f"{target.class_name}.{invoked_method}", new_var_name
         return "UnknownClass." + invoked_method, None  # 만약 소스코드에 정의되지 않은 함수라면
 
     def _if_for_statement(self, node, class_method, var_name, count, current_count):
@@ -258,7 +507,7 @@ class FlowTracker:
                 for var_decl in EFC.var.declarators:
                     if isinstance(var_decl, javalang.tree.VariableDeclarator) and (count < current_count):
                         var_name_2 = var_decl.name
-                        self._track_variable_flow(class_method, var_name_2, current_count)  # for 문 끝날때 까지만 추적하도록 수정 필요
+                        self._enqueue(class_method, var_name_2, current_count)  # for 문 끝날때 까지만 추적하도록 수정 필요
 
     def _if_try(self, node, class_method, var_name, count, current_count):
         try:
@@ -268,7 +517,7 @@ class FlowTracker:
                         for inner_arg in arg.arguments:
                             if isinstance(inner_arg, javalang.tree.MethodInvocation):
                                 if inner_arg.member == var_name and count < current_count:
-                                    self._track_variable_flow(class_method, inner_arg.member, current_count)
+                                    self._enqueue(class_method, inner_arg.member, current_count)
         except Exception:
             pass  # node.value가 없을 때 예외 처리
 
@@ -282,26 +531,26 @@ class FlowTracker:
             # 조건, 참/거짓 식에서 taint 여부를 추적
             try:
                 if isinstance(condition, javalang.tree.MemberReference) and condition.member == var_name:
-                    self._track_variable_flow(class_method, condition.member, current_count)
+                    self._enqueue(class_method, condition.member, current_count)
             except Exception:
                 pass
 
             try:
                 if isinstance(true_expr, javalang.tree.MemberReference) and true_expr.member == var_name:
-                    self._track_variable_flow(class_method, true_expr.member, current_count)
+                    self._enqueue(class_method, true_expr.member, current_count)
             except Exception:
                 pass
 
             try:
                 if isinstance(false_expr, javalang.tree.MemberReference) and false_expr.member == var_name:
-                    self._track_variable_flow(class_method, false_expr.member, current_count)
+                    self._enqueue(class_method, false_expr.member, current_count)
             except Exception:
                 pass
 
         except Exception:
             pass
 
-    def _numbering(self, d, key_tuple, node):
+    def _numbering(self, d, key_tuple):
         if key_tuple in d:
             base_key1, base_key2 = key_tuple
             i = 1
@@ -314,28 +563,51 @@ class FlowTracker:
             return key_tuple
 
     def priority_flow(self):
-        """민감도에 따른 우선순위 흐름 계산"""
+        """민감도에 따른 우선순위 흐름 계산 (flows 에 추가된 순서)"""
         prioritized_flows = []
 
-        for (class_method, var), value in self.flows.items():
-            for flow in self.flows[(class_method, var)]:
-                # 흐름에서 첫 번째 항목 (source)와 마지막 항목 (sink)을 가져옴
-                source_full = flow[0]  # 첫 번째 항목의 첫 번째 요소 추출
-                sink_full = flow[-1]  # 마지막 항목의 첫 번째 요소 추출
+        for key in self.flows:
+            for flow in map(self.store.labels, self.flows.nodes(key)):
+                # 민감도를 흐름 앞에 삽입
+                prioritized_flow = [int(round(self.sensitivities[key]))] + flow
+                prioritized_flows.append(prioritized_flow)
 
-                # 'a.b.c'에서 'c' 부분 추출
-                source = source_full.split('.')[-1]
-                sink = sink_full.split('.')[-1]
+        return prioritized_flows
 
-                # source와 sink의 민감도 값을 가져옴
-                source_sensitivity = S.source_functions.get(source, 0)  # 기본값 0
-                sink_sensitivity = S.sink_functions.get(sink, 0)        # 기본값 0
 
-                # source와 sink 민감도 중 더 큰 값을 사용 (max)
-                total_sensitivity = max(source_sensitivity, sink_sensitivity)
+def rank_priority_flows(priority_flows, top_k=None, min_sensitivity=0):
+    """priority_flow 결과를 민감도가 높은 것부터 하나씩 반환
+
+    민감도가 같으면 priority_flow 의 순서를 유지한다. min_sensitivity 보다 낮은 흐름은 건너뛰고,
+    top_k 를 주면 그 개수까지만 돌려준다. 흐름은 다시 만들지 않고 priority_flow 의 리스트를 그대로 쓴다.
+    """
+    entries = [(-flow[0], index, flow) for index, flow in enumerate(priority_flows) if flow[0] >= min_sensitivity]
+    if top_k is not None:
+        ordered = heapq.nsmallest(top_k, entries)  # 크기 top_k 인 힙만 유지
+    else:
+        entries.sort()
+        ordered = entries
+
+    for _, _, flow in ordered:
+        yield flow
+
+
+_worker_tracker = None  # 프로세스 풀 워커마다 하나씩 만드는 FlowTracker
+
+
+def _init_worker(methods, method_index, max_depth, max_states, summaries, rules, field_types):
+    global _worker_tracker
+    _worker_tracker = FlowTracker(methods, {}, max_depth, max_states, method_index=method_index, summaries=summaries,
+                                  rules=rules, field_types=field_types)
 
-                # 민감도를 흐름 앞에 삽입
-                prioritized_flow = [int(round(total_sensitivity))] + flow
-                prioritized_flows.append(prioritized_flow)
 
-        return prioritized_flows
\ No newline at end of file
+def _track_chunk(seeds):
+    """워커 프로세스에서 seed 묶음을 추적하고, 그동안 새로 만든 요약과 함께 반환"""
+    known = set(_worker_tracker.summaries)
+    results = []
+    for seed in seeds:
+        record, completed = _worker_tracker._track_seed(seed)
+        results.append((seed, _worker_tracker._export_record(record), completed))
+    summaries = {key: _worker_tracker._export_summary(summary)
+                 for key, summary in _worker_tracker.summaries.items() if key not in known}
+    return results, summaries
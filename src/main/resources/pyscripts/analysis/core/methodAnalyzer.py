@@ -1,38 +1,56 @@
 import javalang
-from methodFinder import MethodEndLineFinder
+from collections import namedtuple
+from methodFinder import SourceIndex
+from methodIndex import MethodIndex
+
+
+# 메소드 하나의 분석 결과 (position 은 "시작 줄-끝 줄", source_code 는 그 줄들을 이어 붙인 것)
+MethodDescription = namedtuple("MethodDescription", ["file_path", "position", "cut_tree", "source_code"])
 
 
 class MethodAnalyzer:
-    """메소드 분석 관련 유틸리티 클래스"""
+    """메소드 분석 관련 유틸리티 클래스
+
+    describe() 의 결과는 (클래스, 메소드) 마다 한 번만 계산해서 재사용한다.
+    분석기는 호출 사이에 상태를 바꾸지 않으므로 결과 순서와 상관없이 여러 곳에서 불러도 된다.
+    """
 
-    def __init__(self, methods, source_codes):
+    def __init__(self, methods, source_codes, method_index=None):
         self.methods = methods
+        self.method_index = method_index if method_index is not None else MethodIndex.from_methods(methods)
         self.source_codes = source_codes
-        self._get_position = ""
-        self._current_node = None
-        self._file_path = ""
-
-    def get_cut_tree(self, m_name):
-        """메소드 이름으로 해당 메소드의 트리 정보를 반환"""
-        for (class_name, method_name), method_nodes in self.methods.items():
-            if method_name == m_name:
-                for file_path, method_node in method_nodes:
-                    for path, node in method_node:
-                        if isinstance(node, javalang.tree.MethodDeclaration) and node.name == method_name:
-                            self._current_node = node
-                            self._file_path = file_path
-
-                            # 시작 줄
-                            start_line = node.position.line
-
-                            # 끝 줄을 재귀적으로 계산합니다.
-                            finder = MethodEndLineFinder(self.source_codes[file_path])
-                            end_line = finder.find_method_end_line(start_line)
-
-                            # Store start and end positions in a single variable
-                            self._get_position = f"{start_line}-{end_line}"
-                            # Return or use node_positions as needed
-                            return self._method_declaration_to_string(node)
+        self._descriptions = {}  # (클래스, 메소드) -> MethodDescription 또는 None
+        self._source_indexes = {}  # 파일 경로 -> SourceIndex (파일마다 한 번만 만듦)
+
+    def describe(self, class_name, method_name):
+        """메소드의 파일 경로, 위치, 트리 문자열, 소스 코드 (class_name 의 메소드를 우선, 없으면 None)"""
+        key = (class_name, method_name)
+        if key not in self._descriptions:
+            self._descriptions[key] = self._describe(class_name, method_name)
+        return self._descriptions[key]
+
+    def _describe(self, class_name, method_name):
+        for _, file_path, method_node in self.method_index.overloads(method_name, class_name):
+            for path, node in method_node:
+                if isinstance(node, javalang.tree.MethodDeclaration) and node.name == method_name:
+                    if file_path not in self.source_codes:
+                        raise ValueError(f"파일 경로 '{file_path}'가 source_codes에 존재하지 않습니다.")
+
+                    # 시작 줄과, 파일의 중괄호 짝 표에서 찾은 끝 줄
+                    start_line = node.position.line
+                    end_line = self.source_index(file_path).method_end_line(start_line, node.position.column)
+
+                    return MethodDescription(file_path, f"{start_line}-{end_line}",
+                                             self._method_declaration_to_string(node),
+                                             self._extract_method_source_code(file_path, start_line, end_line))
+        return None
+
+    def source_index(self, file_path):
+        """파일의 SourceIndex (처음 요청할 때 만들고 재사용)"""
+        index = self._source_indexes.get(file_path)
+        if index is None:
+            index = self._source_indexes[file_path] = SourceIndex(self.source_codes[file_path])
+        return index
 
     def _method_declaration_to_string(self, method_node):
         """MethodDeclaration 객체를 전체적으로 문자열로 변환"""
@@ -61,28 +79,6 @@ class MethodAnalyzer:
 
         return '\n'.join(result)
 
-    def extract_method_source_code(self):
-        """메소드의 소스 코드를 추출"""
-        start_line_str, end_line_str = self._get_position.split('-')
-
-        # 파일 경로에 해당하는 소스 코드를 가져옵니다.
-        if self._file_path not in self.source_codes:
-            raise ValueError(f"파일 경로 '{self._file_path}'가 source_codes에 존재하지 않습니다.")
-
-        source_code = self.source_codes[self._file_path]
-
-        # 시작 줄과 끝 줄을 분리하여 정수로 변환합니다.
-        start_line_str, end_line_str = self._get_position.split('-')
-        start_line = int(start_line_str)
-        end_line = int(end_line_str)
-
-        # 소스 코드에서 해당 범위를 추출합니다.
-        lines = source_code.splitlines()
-
-        # 시작 줄과 끝 줄을 기준으로 코드 추출
-        if start_line < 1 or end_line > len(lines):
-            raise ValueError(f"잘못된 줄 번호 범위: 시작 줄 {start_line}, 끝 줄 {end_line}")
-
-        extracted_lines = lines[start_line - 1:end_line]
-
-        return ''.join(extracted_lines)
\ No newline at end of file
+    def _extract_method_source_code(self, file_path, start_line, end_line):
+        """메소드의 소스 코드를 추출 (범위가 잘못되면 ValueError)"""
+        return ''.join(self.source_index(file_path).slice_lines(start_line, end_line))
@@ -1,14 +1,16 @@
 import logging
 from astParser import ASTParser
 from variableExtractor import VariableExtractor
-from flowTracker import FlowTracker
+from flowTracker import FlowTracker, DEFAULT_MAX_DEPTH, DEFAULT_MAX_STATES, rank_priority_flows
 from methodAnalyzer import MethodAnalyzer
+from sensitivityDB import RuleDB
+from analysisState import AnalysisState, FileRecord, INCREMENTAL_ENABLED, config_key, source_fingerprint
 
 
 class TaintAnalysis:
     """Taint 분석을 조정하는 메인 클래스"""
 
-    def __init__(self, java_folder_path):
+    def __init__(self, java_folder_path, project=None, incremental=INCREMENTAL_ENABLED):
         # 로그 설정 - 분석 대상 폴더에 로그 파일 생성
         import os
         log_file_path = os.path.join(java_folder_path, 'taint_analysis.log')
@@ -18,18 +20,45 @@ class TaintAnalysis:
 
         # Step 1: Parse all Java files
         self.parser = ASTParser()
-        trees, self.source_codes = self.parser.parse_java_files(java_folder_path)
+        trees, self.source_codes = self.parser.parse_java_files(java_folder_path, project)
+
+        # source/sink 규칙: 기본 DB + 규칙 팩 + 프로젝트 규칙 파일
+        self.rules = RuleDB.load(java_folder_path)
+        if self.rules.packs:
+            print(f"rule packs: {', '.join(self.rules.packs)}")
+
+        # 증분 분석: 이전 분석 상태와 파일 지문을 비교
+        fingerprints = {file_path: source_fingerprint(code) for file_path, code in self.source_codes.items()}
+        state = AnalysisState.load(java_folder_path, config_key(DEFAULT_MAX_DEPTH, DEFAULT_MAX_STATES, self.rules)) \
+            if incremental else AnalysisState(java_folder_path, None)
+        cached_files = state.unchanged_files(fingerprints)
 
         # Step 2: Extract methods and find tainted variables
-        self.extractor = VariableExtractor()
-        self.__tainted_variables, self.__methods = self.extractor.extract_tainted_variables(trees)
+        self.extractor = VariableExtractor(self.rules)
+        self.__tainted_variables, self.__methods = self.extractor.extract_tainted_variables(trees, self.source_codes,
+                                                                                            cached_files)
+        files = {file_path: FileRecord(fingerprints[file_path], *self.extractor.file_results[file_path])
+                 for file_path, _ in trees}
+        changed_names = state.changed_method_names(files)
 
         # Step 3: Track variable flows
-        self.flow_tracker = FlowTracker(self.__methods, self.source_codes)
+        self.flow_tracker = FlowTracker(self.__methods, self.source_codes, method_index=self.extractor.method_index,
+                                        method_nodes=self.extractor.method_nodes,
+                                        seed_results=state.reusable_seeds(changed_names),
+                                        summaries=state.reusable_summaries(changed_names),
+                                        rules=self.rules, field_types=self.extractor.field_types)
+        reused = sum(1 for seed in self.__tainted_variables if seed in self.flow_tracker.seed_results)
         self.flow_tracker.track_all_flows(self.__tainted_variables)
 
+        if incremental:
+            seeds = self.flow_tracker.portable_seed_results(self.__tainted_variables)
+            state.update(files, seeds, self.flow_tracker.portable_summaries())
+            state.save()
+            print(f"incremental analysis: {len(files) - len(cached_files)}/{len(files)} files re-extracted, "
+                  f"{reused}/{len(self.__tainted_variables)} seeds reused")
+
         # Step 4: Initialize method analyzer for detailed analysis
-        self.method_analyzer = MethodAnalyzer(self.__methods, self.source_codes)
+        self.method_analyzer = MethodAnalyzer(self.__methods, self.source_codes, self.extractor.method_index)
 
         # 호환성을 위해 기존 속성들을 유지
         self.flows = self.flow_tracker.flows
@@ -40,20 +69,10 @@ class TaintAnalysis:
         """민감도에 따른 우선순위 흐름 반환"""
         return self.flow_tracker.priority_flow()
 
-    def _get_cut_tree(self, m_name):
-        """메소드 이름으로 해당 메소드의 트리 정보를 반환"""
-        return self.method_analyzer.get_cut_tree(m_name)
-
-    def _extract_method_source_code(self):
-        """메소드의 소스 코드를 추출"""
-        return self.method_analyzer.extract_method_source_code()
-
-    @property
-    def _get_position(self):
-        """현재 분석 중인 메소드의 위치 정보"""
-        return getattr(self.method_analyzer, '_get_position', "")
+    def _iter_priority_flows(self, priority_flow, top_k=None, min_sensitivity=0):
+        """_priority_flow 로 구한 흐름을 민감도가 높은 것부터 하나씩 반환"""
+        return rank_priority_flows(priority_flow, top_k, min_sensitivity)
 
-    @property
-    def _file_path(self):
-        """현재 분석 중인 파일 경로"""
-        return getattr(self.method_analyzer, '_file_path', "")
\ No newline at end of file
+    def _describe_method(self, class_name, method_name):
+        """메소드의 파일 경로, 위치, 트리 문자열, 소스 코드 (MethodDescription, 없으면 None)"""
+        return self.method_analyzer.describe(class_name, method_name)
@@ -1,42 +1,131 @@
+import bisect
+import re
+
 import javalang
 from collections import defaultdict
-from sensitivityDB import SensitivityDB as S
+from sensitivityDB import RuleDB
+from methodIndex import MethodIndex, MethodNodeIndex, declared_types, qualifier_candidates, type_name
 
 
 class VariableExtractor:
     """Taint 변수를 추출하는 클래스"""
 
-    def __init__(self):
+    def __init__(self, rules=None):
+        self.rules = rules if rules is not None else RuleDB.load()
         self.methods = defaultdict(list)
+        self.method_index = MethodIndex()  # 호출 대상/메소드 이름 조회용
+        self.method_nodes = defaultdict(MethodNodeIndex)  # (클래스, 메소드) -> 흐름 추적용 노드 색인
+        self.skipped_methods = 0
+        self._unindexed_keys = set()  # 순회하지 않은 오버로드가 있는 키 (FlowTracker 가 필요할 때 색인)
         self.tainted_variables = []
         self.method_check = []
+        self.field_types = defaultdict(dict)  # 클래스 -> {필드 이름: 선언 타입}
+        self._current_method = None  # 변수를 추출 중인 메소드 노드
+        self._current_types = None  # 그 메소드의 변수 이름 -> 선언 타입 (필요할 때 계산)
+        self._source_sensitivity = 0  # 마지막으로 _is_source 가 찾은 규칙의 민감도
+        self.file_results = {}  # 파일 경로 -> (선언된 (클래스, 메소드 이름)들, 추출한 taint 변수들, method_check 항목들)
 
-    def extract_tainted_variables(self, trees):
-        """AST에서 taint된 변수들을 추출"""
+    def extract_tainted_variables(self, trees, source_codes=None, cached_files=None):
+        """AST에서 taint된 변수들을 추출
+        (소스 함수 이름이 텍스트에 없는 메소드와 cached_files 의 파일은 메소드 등록만 하고 노드 탐색은 건너뜀)"""
         for file_path, tree in trees:
+            source_code = source_codes.get(file_path) if source_codes is not None else None
+            cached = cached_files.get(file_path) if cached_files is not None else None
+            seeds_start, check_start = len(self.tainted_variables), len(self.method_check)
+            method_names = set()
+
+            if cached is not None:
+                self.tainted_variables.extend(cached.tainted_variables)
+                self.method_check.extend(cached.method_check)
+                source_lines = []
+            else:
+                source_lines = _match_lines(_source_pattern(self.rules.source_names()), source_code) \
+                    if source_code is not None else None
+            nested_lines = _match_lines(_NESTED_DECLARATION, source_code) if source_code is not None else None
+
             current_class = "UnknownClass"
-            for path, node in tree:
+            stack = [iter([(tree, None)])]
+            while stack:
+                item = next(stack[-1], None)
+                if item is None:
+                    stack.pop()
+                    continue
+
+                node, end_line = item
+                if isinstance(node, (list, tuple)):
+                    stack.append(_with_end_lines(node, end_line))
+                    continue
+
+                descend = True
                 if isinstance(node, javalang.tree.ClassDeclaration):
                     current_class = node.name
 
-                elif isinstance(node, javalang.tree.MethodDeclaration):
-                    self._extract_methods(node, current_class, file_path)
+                elif isinstance(node, javalang.tree.FieldDeclaration):
+                    for declarator in node.declarators:
+                        self.field_types[current_class][declarator.name] = type_name(node.type)
+
+                elif isinstance(node, (javalang.tree.MethodDeclaration, javalang.tree.ConstructorDeclaration)):
+                    method_names.add((current_class, node.name))
+                    start_line = node.position.line if node.position else None
+                    if source_lines is None or _any_line_between(source_lines, start_line, end_line):
+                        self._extract_methods(node, current_class, file_path)
+                    else:
+                        self._register_method(node, current_class, file_path)
+                        # 익명/지역 클래스가 있을 수 있는 메소드만 안쪽 선언을 찾으러 들어감
+                        descend = nested_lines is None or _any_line_between(nested_lines, start_line, end_line)
 
-                elif isinstance(node, javalang.tree.ConstructorDeclaration):
-                    self._extract_methods(node, current_class, file_path)
+                if descend:
+                    stack.append(iter([(child, end_line) for child in node.children
+                                       if isinstance(child, (javalang.ast.Node, list, tuple))]))
+
+            self.file_results[file_path] = (frozenset(method_names), self.tainted_variables[seeds_start:],
+                                            self.method_check[check_start:])
+
+        for key in self._unindexed_keys:
+            self.method_nodes.pop(key, None)
 
         return self.tainted_variables, self.methods
 
+    def _register_method(self, node, current_class, file_path):
+        """소스 함수가 없는 메소드는 변수 추출 없이 메소드 목록과 색인에만 추가"""
+        self.methods[(current_class, node.name)].append((file_path, node))
+        self.method_index.add(current_class, file_path, node)
+        self._unindexed_keys.add((current_class, node.name))
+        self.skipped_methods += 1
+
     def _extract_methods(self, node, current_class, file_path):
         """메소드 단위로 AST 노드를 저장하고 taint 변수를 탐색"""
         method_name = node.name
         self.methods[(current_class, method_name)].append((file_path, node))
+        self.method_index.add(current_class, file_path, node)
 
+        self._current_method, self._current_types = node, None
         count = 0
-        for sub_path, sub_node in node:
+        for sub_node in self.method_nodes[(current_class, method_name)].add(node):  # 순회하면서 노드 색인도 만듦
             count += 1  # 각각의 taint 변수가 생겨난 지점 식별
             self._extract_variables(sub_node, current_class, method_name, count)
 
+    def _is_source(self, invocation, current_class):
+        """메소드 호출이 규칙 DB 의 source 인지 (qualifier 조건이 있는 규칙만 변수 타입을 찾음)
+
+        찾은 규칙의 민감도는 _source_sensitivity 에 남겨 두고, 바로 뒤의 _add_seed 가 seed 에 붙인다.
+        """
+        member = invocation.member
+        self._source_sensitivity = 0
+        if member not in self.rules.sources:
+            return False
+        qualifiers = ()
+        if invocation.qualifier and self.rules.needs_qualifier(member):
+            if self._current_types is None:
+                self._current_types = declared_types(self._current_method)
+            qualifiers = qualifier_candidates(invocation.qualifier, self._current_types, self.field_types.get(current_class))
+        self._source_sensitivity = self.rules.source(member, qualifiers, len(invocation.arguments))
+        return self._source_sensitivity > 0
+
+    def _add_seed(self, class_method, var_name, count):
+        """seed (source 메소드, 변수, 위치, 찾은 source 규칙의 민감도) 추가"""
+        self.tainted_variables.append((class_method, var_name, count, self._source_sensitivity))
+
     def _extract_variables(self, sub_node, current_class, method_name, count):
         """AST 노드에서 taint된 변수를 추출"""
         try:
@@ -44,8 +133,8 @@ class VariableExtractor:
             if isinstance(sub_node, javalang.tree.VariableDeclarator):
                 if isinstance(sub_node.initializer, javalang.tree.MethodInvocation):
                     try:
-                        if sub_node.initializer.member in S.source_functions.keys():
-                            self.tainted_variables.append((f"{current_class}.{method_name}.{sub_node.initializer.member}", sub_node.name, count))
+                        if self._is_source(sub_node.initializer, current_class):
+                            self._add_seed(f"{current_class}.{method_name}.{sub_node.initializer.member}", sub_node.name, count)
                             self.method_check.append(method_name)
                     except Exception:
                         pass
@@ -56,8 +145,8 @@ class VariableExtractor:
                             if isinstance(arg, javalang.tree.ClassCreator):
                                 for inner_arg in arg.arguments:
                                     if isinstance(inner_arg, javalang.tree.MethodInvocation):
-                                        if inner_arg.member in S.source_functions:
-                                            self.tainted_variables.append((f"{current_class}.{method_name}.{inner_arg.member}", sub_node.name, count))
+                                        if self._is_source(inner_arg, current_class):
+                                            self._add_seed(f"{current_class}.{method_name}.{inner_arg.member}", sub_node.name, count)
                                             self.method_check.append(method_name)
                     except Exception:
                         pass
@@ -67,17 +156,17 @@ class VariableExtractor:
                 try:
                     if isinstance(sub_node.value, javalang.tree.MethodInvocation):
                         # 직접 MethodInvocation의 member가 source_functions에 있는지 확인
-                        if sub_node.value.member in S.source_functions:
+                        if self._is_source(sub_node.value, current_class):
                             try:
                                 # sub_node.expressionl이 MemberReference인지 확인
                                 if isinstance(sub_node.expressionl, javalang.tree.MemberReference):
-                                    self.tainted_variables.append((f"{current_class}.{method_name}.{sub_node.value.member}", sub_node.expressionl.member, count))
+                                    self._add_seed(f"{current_class}.{method_name}.{sub_node.value.member}", sub_node.expressionl.member, count)
 
                                 # sub_node.expressionl이 This 객체인 경우
                                 elif isinstance(sub_node.expressionl, javalang.tree.This):
                                     for selector in sub_node.expressionl.selectors:
                                         if isinstance(selector, javalang.tree.MemberReference):
-                                            self.tainted_variables.append((f"{current_class}.{method_name}.{sub_node.value.member}", selector.member, count))
+                                            self._add_seed(f"{current_class}.{method_name}.{sub_node.value.member}", selector.member, count)
                             except Exception:
                                 pass
 
@@ -86,13 +175,13 @@ class VariableExtractor:
                             try:
                                 if isinstance(inner_arg, javalang.tree.MethodInvocation):
                                     # 인자의 member가 source_functions에 있는지 확인
-                                    if inner_arg.member in S.source_functions:
+                                    if self._is_source(inner_arg, current_class):
                                         if isinstance(sub_node.expressionl, javalang.tree.MemberReference):
-                                            self.tainted_variables.append((f"{current_class}.{method_name}.{inner_arg.member}", sub_node.expressionl.member, count))
+                                            self._add_seed(f"{current_class}.{method_name}.{inner_arg.member}", sub_node.expressionl.member, count)
                                         elif isinstance(sub_node.expressionl, javalang.tree.This):
                                             for selector in sub_node.expressionl.selectors:
                                                 if isinstance(selector, javalang.tree.MemberReference):
-                                                    self.tainted_variables.append((f"{current_class}.{method_name}.{inner_arg.member}", selector.member, count))
+                                                    self._add_seed(f"{current_class}.{method_name}.{inner_arg.member}", selector.member, count)
                             except Exception:
                                 pass
                 except Exception:
@@ -106,9 +195,59 @@ class VariableExtractor:
                             if isinstance(arg, javalang.tree.ClassCreator):
                                 for inner_arg in arg.arguments:
                                     if isinstance(inner_arg, javalang.tree.MethodInvocation):
-                                        if inner_arg.member in S.source_functions:
-                                            self.tainted_variables.append((f"{current_class}.{method_name}.{inner_arg.member}", sub_node.name, count))
+                                        if self._is_source(inner_arg, current_class):
+                                            self._add_seed(f"{current_class}.{method_name}.{inner_arg.member}", sub_node.name, count)
                 except Exception:
                     pass
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+
+# 메소드 안의 익명 클래스나 지역 클래스 선언 후보
+_NESTED_DECLARATION = re.compile(r'\b(?:new|class|interface|enum)\b')
+_source_pattern_cache = {}
+
+
+def _source_pattern(source_names):
+    """소스 함수 이름 중 하나라도 단어로 나오는지 찾는 정규식"""
+    names = tuple(sorted(source_names, key=len, reverse=True))
+    if names not in _source_pattern_cache:
+        _source_pattern_cache[names] = re.compile(r'\b(?:' + '|'.join(map(re.escape, names)) + r')\b')
+    return _source_pattern_cache[names]
+
+
+def _match_lines(pattern, source_code):
+    """pattern 이 나오는 줄 번호 (1부터, 오름차순)"""
+    lines = []
+    line = 1
+    last = 0
+    for match in pattern.finditer(source_code):
+        line += source_code.count('\n', last, match.start())
+        last = match.start()
+        if not lines or lines[-1] != line:
+            lines.append(line)
+    return lines
+
+
+def _any_line_between(lines, start_line, end_line):
+    """start_line ~ end_line (None 이면 파일 끝) 사이에 lines 중 하나라도 있는지"""
+    if start_line is None:
+        return True  # 위치를 모르면 보수적으로 있다고 봄
+    position = bisect.bisect_left(lines, start_line)
+    return position < len(lines) and (end_line is None or lines[position] <= end_line)
+
+
+def _with_end_lines(nodes, end_line):
+    """리스트의 각 노드에 끝 줄 상한을 붙여서 반환
+
+    같은 리스트(클래스 본문, 문장 목록 등)의 원소는 소스 순서대로 있으므로,
+    한 원소는 위치를 아는 다음 원소가 시작하는 줄을 넘지 않는다.
+    """
+    items = []
+    for child in reversed(nodes):
+        if isinstance(child, (javalang.ast.Node, list, tuple)):
+            items.append((child, end_line))
+            position = child.position if isinstance(child, javalang.ast.Node) else None
+            if position:
+                end_line = position.line
+    return reversed(items)
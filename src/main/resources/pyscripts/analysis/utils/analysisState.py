@@ -0,0 +1,114 @@
+import hashlib
+import os
+import pickle
+import re
+from collections import namedtuple
+
+from astCache import JAVALANG_VERSION
+
+
+STATE_VERSION = 4  # 저장된 흐름을 바꾸는 분석 변경마다 올림
+DEFAULT_STATE_DIR = os.environ.get('TAINTBOMB_ANALYSIS_STATE_DIR',
+                                   os.path.join(os.path.expanduser('~'), '.taintbomb', 'analysis_state'))
+INCREMENTAL_ENABLED = os.environ.get('TAINTBOMB_INCREMENTAL', '1') != '0'
+
+# 파일 하나의 추출 결과 (method_names 는 그 파일에 선언된 메소드/생성자의 (클래스, 이름)들)
+FileRecord = namedtuple("FileRecord", ["fingerprint", "method_names", "tainted_variables", "method_check"])
+# seed 하나의 추적 결과 (depends_on 은 추적 중에 조회한 (클래스, 메소드 이름)들, sinks 는 _record_sink 인자 목록)
+# 이름만으로 찾은 호출은 (None, 이름) 으로 기록하며, 어느 클래스든 그 이름의 메소드가 바뀌면 무효가 된다.
+SeedRecord = namedtuple("SeedRecord", ["depends_on", "sinks"])
+
+# 주석과 문자열/문자 리터럴 (왼쪽부터 먼저 시작하는 것을 하나의 토큰으로 봄)
+_LITERAL_OR_COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.S)
+
+
+def source_fingerprint(source_code):
+    """taint 분석 결과에 영향을 주는 내용의 해시
+
+    리터럴 값은 분석에 쓰이지 않으므로 비워서 해시한다. 문자열 난독화가 실행마다 다른 키로
+    암호화해도 구조가 같은 파일은 같은 지문을 가진다.
+    """
+    def blank(match):
+        token = match.group()
+        return token if token[0] == '/' else token[0] * 2
+
+    return hashlib.sha256(_LITERAL_OR_COMMENT.sub(blank, source_code).encode('utf-8')).hexdigest()
+
+
+def config_key(max_depth, max_states, rules):
+    """분석 결과를 바꾸는 설정 (버전, 규칙 DB, 탐색 한도) 의 해시"""
+    digest = hashlib.sha256()
+    for part in (STATE_VERSION, JAVALANG_VERSION, rules.fingerprint(), max_depth, max_states):
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class AnalysisState:
+    """이전 taint 분석의 파일별 추출 결과, seed 별 흐름, 메서드 요약 (분석 대상 폴더마다 state_dir 아래 파일 하나)"""
+
+    def __init__(self, folder_path, config, state_dir=DEFAULT_STATE_DIR):
+        self.folder_path = folder_path
+        self.config = config
+        self.path = os.path.join(state_dir, hashlib.sha256(os.path.abspath(folder_path).encode('utf-8')).hexdigest()[:32] + '.pickle')
+        self.files = {}  # 파일 경로 -> FileRecord
+        self.seeds = {}  # seed -> SeedRecord
+        self.summaries = {}  # (class_method, 매개변수) -> flowTracker._Summary
+
+    @classmethod
+    def load(cls, folder_path, config, state_dir=DEFAULT_STATE_DIR):
+        state = cls(folder_path, config, state_dir)
+        try:
+            with open(state.path, 'rb') as file:
+                saved = pickle.load(file)
+        except FileNotFoundError:
+            return state
+        except Exception as e:  # 깨졌거나 예전 형식이면 처음부터 분석
+            print(f"analysis state ignored ({state.path}): {e}")
+            return state
+
+        if saved.get('config') == config:
+            state.files, state.seeds, state.summaries = saved['files'], saved['seeds'], saved['summaries']
+        return state
+
+    def save(self):
+        data = {'config': self.config, 'files': self.files, 'seeds': self.seeds, 'summaries': self.summaries}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+            print(f"analysis state not saved ({self.path}): {e}")
+
+    def unchanged_files(self, fingerprints):
+        """지문이 이전과 같은 파일들의 FileRecord"""
+        return {path: record for path, record in self.files.items()
+                if fingerprints.get(path) == record.fingerprint}
+
+    def changed_method_names(self, files):
+        """추가/삭제/수정된 파일에 이전 또는 지금 선언된 (클래스, 메소드 이름)들
+
+        이름만으로 찾은 호출의 의존성 (None, 이름) 과도 겹치도록 (None, 이름) 도 함께 넣는다.
+        """
+        names = set()
+        for path in self.files.keys() | files.keys():
+            old, new = self.files.get(path), files.get(path)
+            if old is not None and new is not None and old.fingerprint == new.fingerprint:
+                continue
+            for record in (old, new):
+                if record is not None:
+                    names.update(record.method_names)
+                    names.update((None, name) for _, name in record.method_names)
+        return names
+
+    def reusable_seeds(self, changed_names):
+        return {seed: record for seed, record in self.seeds.items() if changed_names.isdisjoint(record.depends_on)}
+
+    def reusable_summaries(self, changed_names):
+        return {key: summary for key, summary in self.summaries.items()
+                if changed_names.isdisjoint(summary.depends_on)}
+
+    def update(self, files, seeds, summaries):
+        self.files, self.seeds, self.summaries = files, seeds, summaries
@@ -0,0 +1,135 @@
+from array import array
+from collections.abc import Mapping
+
+
+class FlowStore:
+    """흐름("클래스.메소드" 문자열 목록)을 노드 번호 하나로 저장하는 저장소 (문자열 목록은 labels() 에서만 만듦)"""
+
+    ROOT = 0  # 빈 흐름
+
+    def __init__(self):
+        self.parents = array('i', [-1])
+        # 항목 노드: 부모 흐름 + 항목 하나 (같은 접두사는 한 번만 저장)
+        self.node_labels = array('i', [-1])  # 항목 노드의 항목 번호 (연결 노드는 -1)
+        # 연결 노드: 부모 흐름 + tail 흐름의 skip 번째 이후 (메서드 요약 재사용 시 경로를 복사하지 않음)
+        self.tails = array('i', [-1])  # 연결 노드의 tail 흐름 (항목 노드는 -1)
+        self.skips = array('i', [0])
+        self.depths = array('i', [0])
+        self.label_names = []  # 항목 번호 -> 문자열
+        self._label_ids = {}  # 문자열 -> 항목 번호
+        self._children = {}  # (부모, 항목 번호) 또는 (부모, tail, skip) -> 노드
+        self._interned = {}  # intern() 으로 공유하는 값들
+
+    def __len__(self):
+        return len(self.parents)
+
+    def child(self, node, label):
+        """node 흐름 뒤에 label 을 붙인 흐름의 노드"""
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = self._label_ids[label] = len(self.label_names)
+            self.label_names.append(label)
+        return self._node((node, label_id), node, label_id, -1, 0, self.depths[node] + 1)
+
+    def concat(self, node, tail, skip=0):
+        """node 흐름 뒤에 tail 흐름의 skip 번째 항목부터를 붙인 흐름의 노드"""
+        length = self.depths[tail] - skip
+        if length <= 0:
+            return node
+        if node == self.ROOT and skip == 0:
+            return tail
+        return self._node((node, tail, skip), node, -1, tail, skip, self.depths[node] + length)
+
+    def _node(self, key, parent, label_id, tail, skip, depth):
+        node = self._children.get(key)
+        if node is None:
+            node = self._children[key] = len(self.parents)
+            self.parents.append(parent)
+            self.node_labels.append(label_id)
+            self.tails.append(tail)
+            self.skips.append(skip)
+            self.depths.append(depth)
+        return node
+
+    def extend(self, node, labels):
+        """node 흐름 뒤에 labels 를 차례로 붙인 흐름의 노드"""
+        for label in labels:
+            node = self.child(node, label)
+        return node
+
+    def depth(self, node):
+        """흐름의 길이"""
+        return self.depths[node]
+
+    def first(self, node):
+        """흐름의 첫 항목"""
+        while self.depths[self.parents[node]] > 0:  # 부모가 빈 흐름인 노드까지 올라감
+            node = self.parents[node]
+        tail = self.tails[node]
+        if tail < 0:
+            return self.label_names[self.node_labels[node]]
+        return self.first(tail) if self.skips[node] == 0 else self.labels(tail, self.skips[node])[0]
+
+    def last(self, node):
+        """흐름의 마지막 항목"""
+        return next(self._reversed_labels(node, 1))
+
+    def labels(self, node, start=0):
+        """흐름을 문자열 리스트로 (start 번째 항목부터)"""
+        result = list(self._reversed_labels(node, self.depths[node] - start))
+        result.reverse()
+        return result
+
+    def _reversed_labels(self, node, count):
+        """흐름의 마지막 count 개 항목을 뒤에서부터"""
+        while count > 0:
+            tail = self.tails[node]
+            if tail < 0:
+                yield self.label_names[self.node_labels[node]]
+                count -= 1
+            else:
+                taken = min(count, self.depths[tail] - self.skips[node])
+                yield from self._reversed_labels(tail, taken)
+                count -= taken
+            node = self.parents[node]
+
+    def intern(self, value):
+        """같은 값(sink 키, 로그 메시지 등)을 객체 하나로 공유"""
+        return self._interned.setdefault(value, value)
+
+
+class FlowMap(Mapping):
+    """(class_method, var) 키 -> 흐름 목록 매핑 (흐름은 FlowStore 의 노드로 보관)
+
+    dict 처럼 읽으면 흐름을 문자열 리스트로 만들어서 돌려준다.
+    FlowTracker 는 이미 있는 키에 번호를 붙여 새 키를 만들므로 키마다 흐름은 보통 하나다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._nodes = {}  # 키 -> 노드 또는 [노드] (추가한 순서 유지)
+
+    def add(self, key, node):
+        nodes = self._nodes.get(key)
+        if nodes is None:
+            self._nodes[key] = node
+        elif isinstance(nodes, list):
+            nodes.append(node)
+        else:
+            self._nodes[key] = [nodes, node]
+
+    def nodes(self, key):
+        nodes = self._nodes[key]
+        return nodes if isinstance(nodes, list) else [nodes]
+
+    def __getitem__(self, key):
+        return [self.store.labels(node) for node in self.nodes(key)]
+
+    def __contains__(self, key):
+        return key in self._nodes
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
@@ -1,67 +1,87 @@
-class MethodEndLineFinder:
-    def __init__(self, source_lines):
-        if isinstance(source_lines, str):
-            self.source_lines = source_lines.splitlines()
-        elif isinstance(source_lines, list):
-            if all(isinstance(line, str) for line in source_lines):
-                self.source_lines = source_lines
-            else:
-                self.source_lines = [''.join(line) if isinstance(line, list) else str(line) for line in source_lines]
-        else:
-            raise ValueError("Invalid source_lines format")
-
-    def find_method_end_line(self, start_line):
-        start_index = start_line - 1
-        total_lines = len(self.source_lines)
-        indent_level = self._get_indent_level(self.source_lines[start_index])
-        brace_count = 0
-        in_method = False
+import bisect
+import re
+from array import array
 
-        for i in range(start_index, total_lines):
-            line = self.source_lines[i]
-            stripped_line = line.strip()
 
-            # 빈 줄이나 주석은 건너뛰기
-            if not stripped_line or stripped_line.startswith('//'):
-                continue
+# 주석, 문자열(텍스트 블록 포함)/문자 리터럴, 그리고 구조를 보는 데 필요한 괄호와 세미콜론
+_TOKEN = re.compile(r'//[^\n]*|/\*.*?\*/|"""(?:\\.|[^\\])*?"""|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|[{}();]', re.S)
 
-            # 메소드 시작 확인
-            if not in_method and '{' in line:
-                in_method = True
 
-            # 중괄호 카운트
-            brace_count += self.count_braces(line)
+class SourceIndex:
+    """Java 파일 하나의 줄 위치 표와 중괄호 짝 표
 
-            # 메소드 끝 조건 확인
-            if in_method and brace_count == 0 and self._get_indent_level(line) <= indent_level and '}' in line:
-                return i + 1  # 1-based line numbering
+    파일마다 한 번만 만들고, 메소드의 시작/끝 줄과 소스 조각은 표를 찾아서 바로 구한다.
+    주석과 문자열/문자 리터럴 안의 괄호는 세지 않는다. 줄 나누기는 str.splitlines 와 같다.
+    """
 
-        return total_lines  # 파일 끝에 도달한 경우
+    def __init__(self, source_code):
+        self.source_code = source_code
+        self.lines = source_code.splitlines()
+        self.line_offsets = array('l', [0])  # 줄 번호(0부터) -> 그 줄의 시작 위치
+        for line in source_code.splitlines(keepends=True):
+            self.line_offsets.append(self.line_offsets[-1] + len(line))
 
-    def count_braces(self, line):
-        count = 0
-        in_string = False
-        in_char = False
-        escape = False
+        self.matching_brace = {}  # '{' 위치 -> 짝이 되는 '}' 위치
+        self.paren_offsets = array('l')  # '(' / ')' 위치
+        self.paren_depths = array('l')  # 그 문자 다음의 괄호 깊이
+        self.block_offsets = array('l')  # '{' / ';' 위치
+        self.block_depths = array('l')  # 그 위치의 괄호 깊이
+        self._index_braces()
 
-        for char in line:
-            if escape:
-                escape = False
+    def _index_braces(self):
+        open_braces = []
+        depth = 0
+        for match in _TOKEN.finditer(self.source_code):
+            char = match.group()
+            if len(char) != 1:  # 주석이나 리터럴
                 continue
-
-            if char == '\\':
-                escape = True
-            elif char == '"' and not in_char:
-                in_string = not in_string
-            elif char == "'" and not in_string:
-                in_char = not in_char
-            elif not in_string and not in_char:
+            offset = match.start()
+            if char == '(' or char == ')':
+                depth = depth + 1 if char == '(' else max(depth - 1, 0)
+                self.paren_offsets.append(offset)
+                self.paren_depths.append(depth)
+            elif char == '}':
+                if open_braces:
+                    self.matching_brace[open_braces.pop()] = offset
+            else:
                 if char == '{':
-                    count += 1
-                elif char == '}':
-                    count -= 1
+                    open_braces.append(offset)
+                self.block_offsets.append(offset)
+                self.block_depths.append(depth)
 
-        return count
+    def offset(self, line, column=1):
+        """1부터 세는 (줄, 열) 의 문자 위치"""
+        return self.line_offsets[min(line - 1, len(self.lines))] + column - 1
+
+    def line_of(self, offset):
+        """문자 위치가 있는 줄 번호 (1부터)"""
+        return min(bisect.bisect_right(self.line_offsets, offset), len(self.lines))
+
+    def paren_depth(self, offset):
+        """offset 위치의 괄호 깊이"""
+        position = bisect.bisect_left(self.paren_offsets, offset) - 1
+        return self.paren_depths[position] if position >= 0 else 0
+
+    def method_end_line(self, line, column=1):
+        """(line, column) 에서 선언이 시작하는 메소드의 마지막 줄
+
+        선언과 같은 괄호 깊이에서 처음 나오는 '{' 의 짝이 있는 줄이다 (매개변수의 어노테이션 안
+        중괄호는 건너뜀). 본문 없이 ';' 로 끝나면 그 줄, 짝이 없으면 파일의 마지막 줄이다.
+        """
+        start = self.offset(line, column)
+        depth = self.paren_depth(start)
+        for position in range(bisect.bisect_left(self.block_offsets, start), len(self.block_offsets)):
+            if self.block_depths[position] != depth:
+                continue
+            offset = self.block_offsets[position]
+            if self.source_code[offset] == ';':
+                return self.line_of(offset)
+            end = self.matching_brace.get(offset)
+            return self.line_of(end) if end is not None else len(self.lines)
+        return len(self.lines)
 
-    def _get_indent_level(self, line):
-        return len(line) - len(line.lstrip())
\ No newline at end of file
+    def slice_lines(self, start_line, end_line):
+        """start_line 부터 end_line 까지의 줄 목록 (1부터, 끝 줄 포함)"""
+        if start_line < 1 or end_line > len(self.lines):
+            raise ValueError(f"잘못된 줄 번호 범위: 시작 줄 {start_line}, 끝 줄 {end_line}")
+        return self.lines[start_line - 1:end_line]
@@ -0,0 +1,202 @@
+import bisect
+from collections import defaultdict, namedtuple
+
+import javalang
+
+
+MethodEntry = namedtuple("MethodEntry", ["class_name", "file_path", "node"])
+
+
+class MethodIndex:
+    """메소드 이름, (클래스, 이름), (클래스, 이름, 매개변수 개수) 로 메소드 노드를 바로 찾는 색인
+
+    VariableExtractor 가 메소드를 수집할 때 함께 만든다. 같은 키 안에서는 소스에 나온 순서를 유지한다.
+    """
+
+    def __init__(self):
+        self.classes_by_name = defaultdict(list)  # 이름 -> 그 이름의 메소드가 있는 클래스들 (처음 나온 순서)
+        self.by_class = defaultdict(list)  # (클래스, 이름) -> [MethodEntry]
+        self.by_arity = defaultdict(list)  # (클래스, 이름, 매개변수 개수) -> [MethodEntry]
+        self.by_name_arity = defaultdict(list)  # (이름, 매개변수 개수) -> [MethodEntry]
+        self.classes = set()
+
+    @classmethod
+    def from_methods(cls, methods):
+        """VariableExtractor.methods 형식 ({(클래스, 이름): [(file_path, node)]}) 에서 색인 생성"""
+        index = cls()
+        for (class_name, method_name), method_nodes in methods.items():
+            for file_path, node in method_nodes:
+                index.add(class_name, file_path, node)
+        return index
+
+    def add(self, class_name, file_path, node):
+        entry = MethodEntry(class_name, file_path, node)
+        arity = len(node.parameters)
+
+        if class_name not in self.classes_by_name[node.name]:
+            self.classes_by_name[node.name].append(class_name)
+        self.by_class[(class_name, node.name)].append(entry)
+        self.by_arity[(class_name, node.name, arity)].append(entry)
+        self.by_name_arity[(node.name, arity)].append(entry)
+        self.classes.add(class_name)
+
+    def overloads(self, name, class_name=None):
+        """이름이 같은 메소드들 (class_name 에 있으면 그 클래스 것만, 없으면 모든 클래스)"""
+        if class_name is not None and (class_name, name) in self.by_class:
+            return self.by_class[(class_name, name)]
+        return [entry for owner in self.classes_by_name.get(name, ()) for entry in self.by_class[(owner, name)]]
+
+    def resolve(self, name, arity, class_name=None, arg_index=0):
+        """호출 대상 메소드 결정
+
+        선언 클래스와 매개변수 개수가 모두 맞는 것을 먼저 찾고, 없으면 차례로 조건을 완화한다.
+        (클래스+개수 -> 클래스 -> 개수 -> 이름) 어느 경우든 arg_index 번째 매개변수가 있어야 한다.
+        """
+        candidates = []
+        if class_name is not None:
+            candidates.append(self.by_arity.get((class_name, name, arity), ()))
+            candidates.append(self.by_class.get((class_name, name), ()))
+        candidates.append(self.by_name_arity.get((name, arity), ()))
+        candidates.append(self.overloads(name))
+
+        for entries in candidates:
+            for entry in entries:
+                if len(entry.node.parameters) > arg_index:
+                    return entry
+        return None
+
+    def qualifier_class(self, qualifier, caller_class=None, owner=None):
+        """호출의 qualifier 로 선언 클래스를 추정 (변수 이름처럼 알 수 없으면 None)"""
+        if qualifier == '':
+            return caller_class  # 같은 클래스의 메소드 호출
+        if qualifier is None:  # selector 호출 (this.m(), new C().m(), x.getY().m()), owner 는 그 호출을 첫 selector 로 가진 노드
+            if isinstance(owner, javalang.tree.This):
+                return caller_class
+            if isinstance(owner, javalang.tree.ClassCreator):
+                class_name = type_name(owner.type)
+                return class_name if class_name in self.classes else None
+            return None
+        class_name = qualifier.split('.')[-1]
+        return class_name if class_name in self.classes else None
+
+
+# FlowTracker 가 변수 흐름을 볼 때 처리하는 노드 종류
+RELEVANT_NODE_TYPES = (javalang.tree.MethodInvocation, javalang.tree.Assignment,
+                       javalang.tree.LocalVariableDeclaration, javalang.tree.ForStatement,
+                       javalang.tree.TryResource, javalang.tree.TernaryExpression)
+
+
+class MethodNodeIndex:
+    """(클래스, 메소드) 하나의 관련 노드 목록과 변수 이름 -> 노드 역색인
+
+    오버로드가 여러 개면 methods 에 들어간 순서대로 이어서 센다 (FlowTracker 의 count 와 같은 기준).
+    노드는 하위 트리 어딘가에서 그 이름을 member/qualifier 로 참조할 때 그 이름의 후보가 된다.
+    """
+
+    def __init__(self):
+        self.total = 0  # 지금까지 센 전위 순회 노드 수
+        self.by_name = defaultdict(lambda: ([], []))  # 이름 -> ([전위 순번], [노드])
+        self.method_starts = []  # 오버로드마다 첫 노드의 전위 순번
+        self.method_list = []
+        self.selector_owners = {}  # id(첫 selector 인 메소드 호출) -> 그 selector 를 가진 this / new 노드
+
+    def add(self, method_node):
+        """메소드 노드를 javalang 과 같은 전위 순서로 순회하며 색인하고, 순회한 노드를 차례로 돌려줌"""
+        self.method_starts.append(self.total + 1)
+        self.method_list.append(method_node)
+        open_nodes = []  # (깊이, 순번, 노드, 참조 이름들) - 아직 하위 트리를 순회 중인 관련 노드
+        touched = set()
+        for depth, node in _walk(method_node):
+            self.total += 1
+            while open_nodes and open_nodes[-1][0] >= depth:
+                self._close(touched, *open_nodes.pop()[1:])
+
+            if isinstance(node, RELEVANT_NODE_TYPES):
+                open_nodes.append((depth, self.total, node, set()))
+            if isinstance(node, (javalang.tree.This, javalang.tree.ClassCreator)) and node.selectors:
+                if isinstance(node.selectors[0], javalang.tree.MethodInvocation):
+                    self.selector_owners[id(node.selectors[0])] = node
+
+            names = [value for value in (getattr(node, 'member', None), getattr(node, 'qualifier', None))
+                     if isinstance(value, str) and value]
+            for _, _, _, referenced in open_nodes:
+                referenced.update(names)
+
+            yield node
+
+        while open_nodes:
+            self._close(touched, *open_nodes.pop()[1:])
+
+        # 바깥 노드는 안쪽 노드보다 나중에 닫히므로 이번 메소드에서 추가한 이름만 순번 순서로 다시 정렬
+        for name in touched:
+            counts, nodes = self.by_name[name]
+            order = sorted(range(len(counts)), key=counts.__getitem__)
+            counts[:] = [counts[i] for i in order]
+            nodes[:] = [nodes[i] for i in order]
+
+    def _close(self, touched, count, node, referenced):
+        touched.update(referenced)
+        for name in referenced:
+            counts, nodes = self.by_name[name]
+            counts.append(count)
+            nodes.append(node)
+
+    def method_at(self, count):
+        """전위 순번 count 의 노드가 속한 메소드 노드"""
+        position = bisect.bisect_right(self.method_starts, count) - 1
+        return self.method_list[position] if position >= 0 else None
+
+    def nodes_after(self, name, count):
+        """name 을 참조하는 관련 노드 중 전위 순번이 count 보다 큰 것들을 (순번, 노드) 로 반환"""
+        if name not in self.by_name:
+            return
+        counts, nodes = self.by_name[name]
+        for position in range(bisect.bisect_right(counts, count), len(counts)):
+            yield counts[position], nodes[position]
+
+
+def declared_types(method_node):
+    """메소드의 매개변수와 지역 변수 이름 -> 선언 타입 이름 (패키지를 뺀 이름)"""
+    types = {}
+    for _, node in _walk(method_node):
+        if isinstance(node, (javalang.tree.FormalParameter, javalang.tree.TryResource)):
+            types[node.name] = type_name(node.type)
+        elif isinstance(node, (javalang.tree.LocalVariableDeclaration, javalang.tree.VariableDeclaration)):
+            for declarator in node.declarators:
+                types[declarator.name] = type_name(node.type)
+        elif isinstance(node, javalang.tree.CatchClauseParameter) and node.types:
+            types[node.name] = node.types[-1].split('.')[-1]
+    return types
+
+
+def qualifier_candidates(qualifier, local_types, field_types=None):
+    """규칙과 비교할 qualifier 문자열과, 첫 이름이 변수면 그 선언 타입"""
+    variable = qualifier.split('.')[0]
+    declared = local_types.get(variable) or (field_types or {}).get(variable)
+    return (qualifier, declared) if declared else (qualifier,)
+
+
+def type_name(type_node):
+    """javalang 타입 노드의 마지막 이름 (java.util.Scanner -> Scanner)"""
+    name = None
+    while type_node is not None:
+        name = getattr(type_node, 'name', name)
+        type_node = getattr(type_node, 'sub_type', None)
+    return name
+
+
+def _walk(root):
+    """javalang.ast.walk_tree 와 같은 순서로 (깊이, 노드) 를 반환 (재귀 없이)"""
+    done = object()
+    stack = [(0, iter((root,)))]
+    while stack:
+        depth, children = stack[-1]
+        child = next(children, done)
+        if child is done:
+            stack.pop()
+            continue
+        if isinstance(child, javalang.ast.Node):
+            yield depth, child
+            stack.append((depth + 1, iter(child.children)))
+        elif isinstance(child, (list, tuple)):
+            stack.append((depth, iter(child)))
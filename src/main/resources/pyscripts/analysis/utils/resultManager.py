@@ -2,9 +2,15 @@ import json
 
 
 class AnalysisResultManager:
+    """analysis_result.json 의 민감도별 항목 모음
+
+    민감도마다 (file_path, tree_position) -> 항목 dict 를 두고, 같은 키의 항목이 다시 들어오면
+    이전 항목을 지우고 맨 뒤에 추가한다 (목록에서 찾아서 지우던 것과 같은 순서).
+    """
+
     def __init__(self, json_file_path):
         self.json_file_path = json_file_path
-        self.results = {}
+        self.results = {}  # 민감도 -> {(file_path, tree_position): 항목}
 
     def append(self, sensitivity, file_path, method_name, tree_position, cut_tree, source_code):
         sensitivity = int(sensitivity)
@@ -16,26 +22,34 @@ class AnalysisResultManager:
             "source_code": source_code
         }
 
-        if sensitivity not in self.results:
-            self.results[sensitivity] = {"sensitivity": sensitivity, "tainted": []}
-
-        # 기존 항목 중 file_path와 tree_position이 같은 항목 찾기
-        existing_entry = next((item for item in self.results[sensitivity]["tainted"]
-                               if item["file_path"] == file_path and item["tree_position"] == tree_position), None)
+        tainted = self.results.setdefault(sensitivity, {})
 
-        if existing_entry:
-            # 기존 항목이 있으면 교체
-            self.results[sensitivity]["tainted"].remove(existing_entry)
-
-        # 새 항목 추가
-        self.results[sensitivity]["tainted"].append(new_entry)
+        # file_path와 tree_position이 같은 기존 항목이 있으면 지우고 새 항목을 맨 뒤에 추가
+        key = (file_path, tree_position)
+        tainted.pop(key, None)
+        tainted[key] = new_entry
 
     def save_to_json(self):
         try:
-            # sensitivity를 기준으로 내림차순 정렬
-            sorted_results = sorted(self.results.values(), key=lambda x: x["sensitivity"], reverse=True)
-
             with open(self.json_file_path, 'w') as f:
-                json.dump(sorted_results, f, indent=4)
+                for chunk in self._iter_json():
+                    f.write(chunk)
         except IOError as e:
-            print(f"파일 쓰기 오류: {e}")
\ No newline at end of file
+            print(f"파일 쓰기 오류: {e}")
+
+    def _iter_json(self):
+        """json.dump(..., indent=4) 와 같은 내용을 항목 단위로 나눠서 반환 (sensitivity 내림차순)"""
+        if not self.results:
+            yield "[]"
+            return
+
+        encoder = json.JSONEncoder(indent=4)
+        yield "["
+        for bucket_index, sensitivity in enumerate(sorted(self.results, reverse=True)):
+            yield ("," if bucket_index else "") + "\n    {\n"
+            yield f'        "sensitivity": {encoder.encode(sensitivity)},\n        "tainted": ['
+            for entry_index, entry in enumerate(self.results[sensitivity].values()):
+                # 문자열 안의 줄바꿈은 이스케이프되므로 줄마다 들여쓰기를 더하면 된다
+                yield ("," if entry_index else "") + "\n            " + encoder.encode(entry).replace("\n", "\n            ")
+            yield "\n        ]\n    }"
+        yield "\n]"
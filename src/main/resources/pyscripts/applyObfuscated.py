@@ -1,9 +1,15 @@
 import re
 
 class ApplyObfuscated:
-    def __init__(self, file_path, method_code, obfuscated_code):
+    def __init__(self, file_path, method_code, obfuscated_code, project=None):
         self.content = re.sub(r'\s+', ' ', method_code.strip())
 
+        unit = project.get(file_path) if project is not None else None
+        if unit is not None:  # 상주 워커에서는 메모리의 소스를 고치고 디스크에는 나중에 한 번에 씀
+            self.content = self.replace_method(unit.source, method_code, obfuscated_code)
+            unit.replace(self.content)
+            return
+
         self.content = self.open_file(file_path)
         self.content = self.replace_method(self.content, method_code, obfuscated_code)
         self.write_file(file_path, self.content)
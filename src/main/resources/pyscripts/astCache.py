@@ -0,0 +1,196 @@
+import atexit
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import javalang
+
+try:
+    from importlib.metadata import version as _package_version
+    JAVALANG_VERSION = _package_version('javalang')
+except Exception:  # 메타데이터를 읽을 수 없는 환경
+    JAVALANG_VERSION = 'unknown'
+
+
+DEFAULT_CACHE_DIR = os.environ.get('TAINTBOMB_AST_CACHE_DIR',
+                                   os.path.join(os.path.expanduser('~'), '.taintbomb', 'ast_cache'))
+DEFAULT_MAX_BYTES = int(os.environ.get('TAINTBOMB_AST_CACHE_MAX_MB', '512')) * 1024 * 1024
+CACHE_ENABLED = os.environ.get('TAINTBOMB_AST_CACHE', '1') != '0'
+
+
+class ASTCache:
+    """파일 내용(SHA-256)과 javalang 버전을 키로 하는 디스크 AST 캐시
+    (max_bytes 를 넘으면 mtime 기준 LRU 로 삭제, memory_limit 만큼 최근 트리는 메모리에도 보관)"""
+
+    _shared = None
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=CACHE_ENABLED, memory_limit=0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.memory_limit = memory_limit
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = None  # 처음 저장할 때 디렉토리를 한 번 훑어서 계산
+
+        if self.enabled:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"AST cache disabled ({self.cache_dir}): {e}")
+                self.enabled = False
+
+    @classmethod
+    def shared(cls):
+        """프로세스 전체에서 공유하는 캐시 인스턴스 (종료 시 hit/miss 리포트 출력)"""
+        if cls._shared is None:
+            cls._shared = cls()
+            atexit.register(cls._shared.report)
+        return cls._shared
+
+    @staticmethod
+    def content_key(source_code):
+        digest = hashlib.sha256()
+        digest.update(JAVALANG_VERSION.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(source_code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def parse(self, source_code):
+        """캐시에 있으면 저장된 AST 를, 없으면 javalang 으로 파싱한 뒤 저장한다.
+
+        파싱 오류는 javalang.parse.parse 와 동일하게 그대로 전달되며 캐시되지 않는다.
+        """
+        key = self.content_key(source_code)
+        tree = self._memory_get(key)
+        if tree is not None:
+            self.hits += 1
+            return tree
+
+        tree = self._load(key) if self.enabled else None
+        if tree is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            tree = javalang.parse.parse(source_code)
+            if self.enabled:
+                self._store(key, tree)
+
+        self._memory_put(key, tree)
+        return tree
+
+    def lookup(self, source_code):
+        """메모리에 들고 있는 트리만 확인 (없으면 None)"""
+        if not self.memory_limit:
+            return None
+        tree = self._memory_get(self.content_key(source_code))
+        if tree is not None:
+            self.hits += 1
+        return tree
+
+    def remember(self, source_code, tree):
+        """다른 프로세스에서 파싱해 온 트리를 메모리 캐시에 등록"""
+        if self.memory_limit:
+            self._memory_put(self.content_key(source_code), tree)
+
+    def _memory_get(self, key):
+        tree = self._memory.get(key)
+        if tree is not None:
+            self._memory.move_to_end(key)
+        return tree
+
+    def _memory_put(self, key, tree):
+        if not self.memory_limit:
+            return
+        self._memory[key] = tree
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_limit:
+            self._memory.popitem(last=False)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pickle')
+
+    def _load(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                tree = pickle.load(file)
+            os.utime(path)  # LRU 순서 갱신
+            return tree
+        except FileNotFoundError:
+            return None
+        except Exception:  # 깨진 항목은 지우고 다시 파싱
+            self._remove(path)
+            return None
+
+    def _store(self, key, tree):
+        path = self._entry_path(key)
+        try:
+            data = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)  # 여러 프로세스가 동시에 써도 깨지지 않도록
+        except OSError:
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._total_bytes += len(data)
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if file_name.endswith('.pickle'):
+                    path = os.path.join(root, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """가장 오래 사용하지 않은 항목부터 지워서 max_bytes 의 90% 이하로 줄인다"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                self.evictions += 1
+
+        self._total_bytes = total
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def report(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return
+        print(f"AST cache: {self.hits} hit, {self.misses} miss, {self.evictions} evicted "
+              f"({self.hits * 100 // total}% hit, {self.cache_dir})")
+
+
+def parse_java(source_code):
+    """공유 AST 캐시를 거쳐 Java 소스를 파싱"""
+    return ASTCache.shared().parse(source_code)
@@ -2,6 +2,8 @@ import os
 import javalang
 import sys
 
+from astCache import parse_java
+
 # 특정 디렉토리에서 모든 .java 파일을 찾아 파싱하는 함수
 def parse_java_files_in_directory(directory_path):
     java_files = []
@@ -21,7 +23,7 @@ def parse_java_files_in_directory(directory_path):
             java_code = f.read()
             try:
                 # Java 코드 파싱
-                tree = javalang.parse.parse(java_code)
+                tree = parse_java(java_code)
                 parsed_files[java_file] = tree
             except javalang.parser.JavaSyntaxError as e:
                 print(f"Error parsing {java_file}")
@@ -12,16 +12,16 @@ def calculate_sha256(file_path):
 
 
 def python_in_directory(directory_path, exclude_file='create_hash.py', output_file='check_hash'):
-    """디렉토리 내의 .py 파일들의 SHA-256 해시값을 계산하고 결과를 output_file에 저장합니다."""
+    """디렉토리 내의 .py/.json 파일들의 SHA-256 해시값을 계산하고 결과를 output_file에 저장합니다."""
     file_hashes = {}
 
     # 모든 .py 파일을 탐색하여 해시값 계산
     for root, _, files in os.walk(directory_path):
         for file in files:
-            if file.endswith('.py') and file != exclude_file:
+            if file.endswith(('.py', '.json')) and file != exclude_file:
                 file_path = os.path.join(root, file)
                 file_hash = calculate_sha256(file_path)
-                file_name = file.replace('.py', '')
+                file_name = file.replace('.py', '')  # .json 같은 다른 파일은 확장자까지 기록
                 file_hashes[file_name] = file_hash
 
     # 딕셔너리를 파일에 저장
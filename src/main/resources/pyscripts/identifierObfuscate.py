@@ -4,11 +4,20 @@ import secrets
 import javalang
 import re
 
+from astCache import parse_java
+from project import Project
+
+
+WORD = re.compile(r'\w+')
+LITERAL_SPLIT = re.compile(r'("[^"]*"|\'[^\']*\'|<[^>]*>)')  # 문자열/문자 리터럴과 <...> 를 나누는 패턴
+
+
 class ob_identifier:
 
-    def __init__(self, folder_path, output_folder):
+    def __init__(self, folder_path, output_folder, project=None):
         self.folder_path = folder_path
         self.output_folder = output_folder
+        self.project, owns_project = Project.open(folder_path, project)
 
         self.main_class = None
         self.ann_list = []
@@ -27,6 +36,7 @@ class ob_identifier:
         self.variable_in_file = {}
 
         self.identifier_map = {}  # 난독화 맵
+        self.identifier_matcher = None  # 난독화 맵으로 한 번만 만드는 식별자 치환 정규식
         self.files = []  # 파일 경로 저장
         self.package_map = []  # 패키지 이름 저장 or set으로 해야할지도
         self.ran = secrets.choice(range(2))
@@ -37,6 +47,8 @@ class ob_identifier:
 
         # 난독화 적용
         self.apply_obfuscation_to_files()
+        if owns_project:
+            self.project.flush()
         print(self.identifier_map)
         print(self.imp_var_list)
 
@@ -68,21 +80,17 @@ class ob_identifier:
 
     def collect_files(self):
         """모든 자바 파일을 수집합니다."""
-        for root, dirs, files in os.walk(self.folder_path):
-            for file in files:
-                if file.endswith('.java'):
-                    file_path = os.path.join(root, file)
-                    self.files.append(file_path)
+        for unit in self.project.units:
+            self.files.append(unit.path)
 
 
     def build_obfuscation_map(self):
         """모든 파일을 처리하고 난독화할 식별자를 수집하여 맵을 구성합니다."""
         for file_path in self.files:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                source_code = file.read()
+            source_code = self.project.get(file_path).source
 
             try:
-                tree = javalang.parse.parse(source_code)
+                tree = parse_java(source_code)
             except SyntaxError as e:  # 문법 오류는 파이썬의 SyntaxError로 처리
                 print(f"Syntax error in file {file_path}: {e}")
             except javalang.parser.JavaSyntaxError as e:
@@ -178,6 +186,7 @@ class ob_identifier:
             self.check_not_ob(file_path)
 
 
+        self.identifier_matcher = self.build_identifier_matcher()
         for file_path in self.files:
             print(f"Identifier Obfuscating.. {file_path}")
             self.obfuscate_java_file(file_path, self.output_folder)
@@ -185,6 +194,16 @@ class ob_identifier:
         # self.replace_gradle()
 
 
+    def build_identifier_matcher(self):
+        """난독화 맵의 식별자를 찾는 정규식 (파일을 처리하기 전에 한 번만 만듦)
+
+        \\b(이름1|이름2|...)\\b 는 \\w 로만 된 이름이면 \\w+ 토큰 전체가 맵에 있을 때만 맞으므로,
+        토큰을 찾아서 dict 로 바로 확인한다. \\w 가 아닌 문자($ 등)가 든 이름이 있으면 예전 정규식을 한 번 컴파일해서 쓴다.
+        """
+        if all(WORD.fullmatch(original) for original in self.identifier_map):
+            return WORD
+        return re.compile(r'\b(' + '|'.join(re.escape(original) for original in self.identifier_map.keys()) + r')\b')
+
     def replace_gradle(self):
         # build.gradle 파일 수정
         build_gradle_path = os.path.join(self.folder_path, 'build.gradle')
@@ -218,11 +237,8 @@ class ob_identifier:
         """난독화된 식별자를 실제로 파일에 적용하여 저장."""
 
         print("Processing file : ",file_path)
-        with open(file_path, 'r', encoding='utf-8') as file:
-            source_code = file.read()
-
-
-        os.remove(file_path)
+        unit = self.project.get(file_path)
+        source_code = unit.source
 
         # 난독화 맵을 사용하여 소스 코드에 난독화된 식별자 치환 적용
         obfuscated_code = self.replace_identifiers_in_code(source_code,file_path)
@@ -241,10 +257,9 @@ class ob_identifier:
         new_file_name = f"{class_or_enum_obfuscated}.java"
         output_path = os.path.join(self.output_folder, base_dir, new_file_name)
 
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        with open(output_path, 'w', encoding='utf-8') as new_file:
-            new_file.write(obfuscated_code)  # 난독화된 코드를 새 파일에 저장
+        # 새 파일 이름으로 옮기고, 기존 파일은 flush 할 때 지워짐
+        unit.replace(obfuscated_code)
+        unit.rename(output_path)
 
     def analyze_method_declaration(self,line):  # 메서드 식별
         pattern = r'''
@@ -417,8 +432,7 @@ class ob_identifier:
 
     def check_external(self,file_path):
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            source_code = file.read()
+        source_code = self.project.get(file_path).source
         start_package = True
         ann = None
         external_class = set()
@@ -464,8 +478,7 @@ class ob_identifier:
 
     def check_not_ob(self,file_path):
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            source_code = file.read()
+        source_code = self.project.get(file_path).source
 
         # 파일의 각 라인을 처리
         lines = source_code.splitlines()
@@ -529,11 +542,14 @@ class ob_identifier:
 
         # 파일의 각 라인을 처리
         lines = source_code.splitlines()
+        line_parts = []  # 줄마다 나눈 조각들 (코드 조각 자리는 None)
+        code_parts = []  # 식별자를 치환할 코드 조각들 (나온 순서)
         curr_class =None
         for i, line in enumerate(lines):
             if line.strip().startswith("package"):
                 if start_package:
                     start_package = False
+                    line_parts.append([line])
                     continue
 
             if line.strip().startswith("@"): # 어노테이션 식별(사용자 정의인지 확인후 아니라면 난독화 제약 걸기)
@@ -571,6 +587,7 @@ class ob_identifier:
 
                     else:
                         external_class.add(package_name.split('.')[-1])
+                        line_parts.append([line])
                         continue
 
 
@@ -649,7 +666,7 @@ class ob_identifier:
 
 
             # 문자열 리터럴 ("...")을 분리하여 처리
-            parts = re.split(r'("[^"]*"|\'[^\']*\'|<[^>]*>)', line)
+            parts = LITERAL_SPLIT.split(line)
 
             for j, part in enumerate(parts):
                 # 문자열 리터럴은 그대로 두고, 리터럴이 아닌 코드 부분만 난독화 처리
@@ -669,29 +686,27 @@ class ob_identifier:
 
 
 
-                    # 식별자 패턴을 빌드합니다.
-                    pattern = r'\b(' + '|'.join(re.escape(original) for original in self.identifier_map.keys()) + r')\b'
+                    code_parts.append(part)
+                    part = None
+                parts[j] = part
 
-                    # 교체 함수를 정의합니다.
-                    def replacer(match):
-                        original = match.group(0)
-                        return self.identifier_map.get(original, original)
+            line_parts.append(parts)
 
-                    # 모든 식별자를 한 번에 대체
-                    part = re.sub(pattern, replacer, part)
-                    # for original, obfuscated in self.identifier_map.items():
-                    #
-                    #     # 일반적인 식별자 패턴
-                    #     pattern = r'\b' + re.escape(original) + r'\b'
-                    #     part = re.sub(pattern, obfuscated, part)
-                    part = part.replace("_DO_NOT_OBFUSCATE","")
-                parts[j] = part
+        # 모든 줄의 코드 조각을 한 번에 치환 (조각 사이의 줄바꿈이 식별자를 끊으므로 조각마다 치환한 것과 같음)
+        if self.identifier_matcher is None:
+            self.identifier_matcher = self.build_identifier_matcher()
+        replaced = self.identifier_matcher.sub(self.__replace_identifier, '\n'.join(code_parts))
+        replaced = iter(replaced.replace("_DO_NOT_OBFUSCATE", "").split('\n'))
+        lines = [''.join(next(replaced) if part is None else part for part in parts) for parts in line_parts]
 
-            lines[i] = ''.join(parts)
         # 난독화된 코드를 반환
         obfuscated_code = '\n'.join(lines)
         return obfuscated_code
 
+    def __replace_identifier(self, match):
+        original = match.group(0)
+        return self.identifier_map.get(original, original)
+
 
 if __name__ == '__main__':
     import sys
@@ -15,4 +15,5 @@ def install(package):
 if __name__ == '__main__':
     install('pycryptodome')
     install('javalang')
+    install('numpy')
     install('anthropic')
\ No newline at end of file
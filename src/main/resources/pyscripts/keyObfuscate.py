@@ -1,11 +1,35 @@
 import hashlib
 import os
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+ROUNDS = 16
+BLOCK_SIZE = 16
+HALF_SIZE = BLOCK_SIZE // 2
+
 
 class KeyObfuscate:
     def __init__(self, aes_key, enc_key):
         self.enc_aes_key = self.__key_encrypt(aes_key, enc_key)
 
+    @classmethod
+    def encrypt_keys(cls, aes_keys, enc_keys, rounds=ROUNDS):
+        """여러 클래스의 AES 키를 한 번에 암호화 ([KeyObfuscate(a, k).enc_aes_key ...] 와 같은 결과)
+
+        numpy 가 있으면 모든 키를 한 행렬로 묶어 라운드마다 한 번씩 XOR 하고,
+        없거나 한 번에 묶을 수 없는 키(길이가 다르거나 8바이트보다 짧음)면 하나씩 암호화한다.
+        """
+        aes_keys, enc_keys = list(aes_keys), list(enc_keys)
+        key_lengths = {len(enc_key) for enc_key in enc_keys}
+        if NUMPY_AVAILABLE and len(key_lengths) == 1 and key_lengths.pop() >= HALF_SIZE:
+            return _encrypt_batch(aes_keys, enc_keys, rounds)
+        return [cls(aes_key, enc_key).enc_aes_key for aes_key, enc_key in zip(aes_keys, enc_keys)]
+
     def __key_schedule(self, key, rounds):
         key_length = len(key)
         schedule = [key]
@@ -72,4 +96,103 @@ class KeyObfuscate:
 
     def __key_decrypt(self, enc2_aes_key, key2):
         enc_aes_key = self.__decrypt(enc2_aes_key, key2)
-        return enc_aes_key
\ No newline at end of file
+        return enc_aes_key
+
+
+def _key_schedules(keys, rounds):
+    """(키 개수, 키 길이) uint8 행렬 -> (라운드, 키 개수, 키 길이) 라운드 키
+
+    __key_schedule 과 같다: 새 키의 j 번째 = 이전 키의 (j+1), (j+5), (j+13) 번째 XOR, 짝수 번째는 비트 반전.
+    """
+    key_length = keys.shape[1]
+    positions = np.arange(key_length)
+    rotations = [(positions + shift) % key_length for shift in (1, 5, 13)]
+    invert = np.where(positions % 2 == 0, 0xFF, 0).astype(np.uint8)
+
+    schedule = np.empty((rounds,) + keys.shape, dtype=np.uint8)
+    schedule[0] = keys
+    for i in range(1, rounds):
+        prev_key = schedule[i - 1]
+        schedule[i] = prev_key[:, rotations[0]] ^ prev_key[:, rotations[1]] ^ prev_key[:, rotations[2]] ^ invert
+    return schedule
+
+
+def _encrypt_batch(datas, keys, rounds):
+    """__encrypt 를 여러 (데이터, 키) 에 한 번에 (키 길이는 모두 같고 8 이상)
+
+    데이터는 가장 긴 것에 맞춰 0 으로 채운 (개수, 블록 수, 16) 행렬로 만든다. 블록은 서로 독립이므로
+    채운 블록은 결과에서 잘라내면 된다. 한 라운드는 (L, R) -> (R, L ^ R ^ 라운드 키[:8]) 이다.
+    """
+    padded_lengths = [-(-len(data) // BLOCK_SIZE) * BLOCK_SIZE for data in datas]
+    width = max(padded_lengths, default=0)
+    blocks = np.zeros((len(datas), width), dtype=np.uint8)
+    for row, data in enumerate(datas):
+        blocks[row, :len(data)] = np.frombuffer(bytes(data), dtype=np.uint8)
+    blocks = blocks.reshape(len(datas), width // BLOCK_SIZE, BLOCK_SIZE)
+
+    key_matrix = np.frombuffer(b''.join(bytes(key) for key in keys), dtype=np.uint8).reshape(len(keys), -1)
+    round_keys = _key_schedules(key_matrix, rounds)[:, :, np.newaxis, :HALF_SIZE]  # 블록 축으로 broadcast
+
+    left, right = blocks[..., :HALF_SIZE], blocks[..., HALF_SIZE:]
+    for round_key in round_keys:
+        left, right = right, left ^ right ^ round_key
+
+    encrypted = np.concatenate((left, right), axis=-1).reshape(len(datas), width)
+    return [encrypted[row, :length].tobytes() for row, length in enumerate(padded_lengths)]
+
+
+# (AES 키, 암호화 키, KeyObfuscate 결과) 기준 값 - src/test 의 KeyDecryptTest 가 Java keyDecrypt 로 되돌려 확인
+TEST_VECTORS = [
+    ('00000000000000000000000000000000', '0000000000000000',
+     '00ff00ff00ff00ffff00ff00ff00ff00'),
+    ('000102030405060708090a0b0c0d0e0f', '0001020304050607',
+     '0ff309f10bf70df5f20af00cf60ef408'),
+    ('ffffffffffffffffffffffffffffffff', 'ffffffffffffffff',
+     'ff00ff00ff00ff0000ff00ff00ff00ff'),
+    ('f05d9b66d1877dffb5d46f9ea92669ef', '4b6cd21db2d5ee3f',
+     'ec86bca1756a61905c361939867c8576'),
+    ('47a7c7a9b066a6dad4a26dd075681473', '0984a3d739a97678',
+     'b99b4be8e02bad56a3a7313bbf1ee1bc'),
+    ('edbb4567bcfc4886c6acabee5643a969', '213258024de078b3',
+     '51067aff3378a5c6a0f4a7ee9c5336cb'),
+    ('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f2021222324252627', '6465666768696a6b',
+     '07fb09f903ff0dfd9e6e9c609262906c17eb19e913ef1ded9e6e9c609262906c0ff203f20ff203f2b647b64bbe4fbe43'),
+    ('000102030405060708090a0b0c0d0e0f', '000102030405060708090a0b0c0d0e0f',
+     '0ffb09f103f70dfdfa0af004f60efc08'),
+]
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    # 기준 값 확인과 처리량 비교: python keyObfuscate.py [클래스 개수]
+    for aes_key, enc_key, expected in TEST_VECTORS:
+        aes_key, enc_key = bytes.fromhex(aes_key), bytes.fromhex(enc_key)
+        encrypted = KeyObfuscate(aes_key, enc_key).enc_aes_key
+        assert encrypted.hex() == expected, f"test vector mismatch: {aes_key.hex()} / {enc_key.hex()}"
+        assert KeyObfuscate(aes_key, enc_key)._KeyObfuscate__decrypt(encrypted, enc_key) == aes_key.rstrip(b'\x00')
+    batched = 0
+    for key_length in sorted({len(bytes.fromhex(enc_key)) for _, enc_key, _ in TEST_VECTORS}):
+        vectors = [vector for vector in TEST_VECTORS if len(bytes.fromhex(vector[1])) == key_length]
+        batch = KeyObfuscate.encrypt_keys([bytes.fromhex(a) for a, _, _ in vectors], [bytes.fromhex(k) for _, k, _ in vectors])
+        assert [encrypted.hex() for encrypted in batch] == [expected for _, _, expected in vectors], "batch differs"
+        batched += len(vectors)
+    assert batched == len(TEST_VECTORS), "some test vectors skipped the batch path"
+    print(f"{len(TEST_VECTORS)} test vectors ok (numpy: {NUMPY_AVAILABLE})")
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    aes_keys = [os.urandom(16) for _ in range(count)]
+    enc_keys = [os.urandom(8) for _ in range(count)]
+
+    start = time.perf_counter()
+    single = [KeyObfuscate(aes_key, enc_key).enc_aes_key for aes_key, enc_key in zip(aes_keys, enc_keys)]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = KeyObfuscate.encrypt_keys(aes_keys, enc_keys)
+    batch_time = time.perf_counter() - start
+
+    assert single == batch, "batch key encryption differs from per-class encryption"
+    print(f"per class: {count / single_time:,.0f} keys/s")
+    print(f"batch: {count / batch_time:,.0f} keys/s")
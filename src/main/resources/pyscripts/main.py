@@ -2,6 +2,7 @@ from taintAnalyzer import TaintAnalysis
 from resultManager import AnalysisResultManager
 from reportGenerator import MakeMD
 from datetime import datetime
+import os
 
 try:
     from claude_simple import send_to_claude
@@ -9,6 +10,10 @@ try:
 except ImportError:
     CLAUDE_AVAILABLE = False
 
+# analysis_result.json 에 넣을 흐름 (기본값은 모든 흐름)
+RESULT_MIN_SENSITIVITY = int(os.environ.get('TAINTBOMB_RESULT_MIN_SENSITIVITY', '0'))
+RESULT_TOP_K = int(os.environ.get('TAINTBOMB_RESULT_TOP_K', '0')) or None
+
 def create_result(output_folder, flows):
     path = output_folder + "/taint_result.txt"
     with open(path, 'w', encoding='utf-8') as file:  # 결과 파일 생성
@@ -32,11 +37,12 @@ def print_result(flows):
     print()
 
 
-def __analyze_method(output_folder, tainted):
+def __analyze_method(output_folder, tainted, priority_flow):
     json_file_path = output_folder + "/analysis_result.json"
     result = AnalysisResultManager(json_file_path)
 
-    flows = tainted._priority_flow()
+    # 민감도가 높은 흐름부터 (같은 민감도 안에서는 발견 순서)
+    flows = tainted._iter_priority_flows(priority_flow, RESULT_TOP_K, RESULT_MIN_SENSITIVITY)
 
     for flow in flows:
         sensitivity = flow[0]  # 민감도 값
@@ -49,13 +55,12 @@ def __analyze_method(output_folder, tainted):
             parts = big_parts[0].split('.')
             little_method_name = parts[1]
 
-            cut_tree = tainted._get_cut_tree(little_method_name)
-            current_path = tainted._file_path
-            tree_position = tainted._get_position
-            source_code = tainted._extract_method_source_code()
+            method = tainted._describe_method(parts[0], little_method_name)
+            if method is None:  # 선언을 찾을 수 없는 메소드 (생성자 등)
+                continue
             method_name = method_full_path
 
-            result.append(sensitivity, current_path, method_name, tree_position, cut_tree, source_code)
+            result.append(sensitivity, method.file_path, method_name, method.position, method.cut_tree, method.source_code)
 
     result.save_to_json()  # 결과를 JSON 파일로 저장
     return json_file_path  # JSON 파일 경로 반환
@@ -78,8 +83,8 @@ def __run_claude_analysis(priority_flow, output_folder, api_key=None):
         print(f"Claude 분석 오류: {e}")
 
 
-def main(output_folder, api_key=None) :
-    tainted = TaintAnalysis(output_folder)
+def main(output_folder, api_key=None, project=None) :
+    tainted = TaintAnalysis(output_folder, project)
     priority_flow = tainted._priority_flow()
 
     if not priority_flow:  # priority_flow가 비어있는 경우
@@ -99,7 +104,7 @@ def main(output_folder, api_key=None) :
     else:
         print_result(priority_flow)
         create_result(output_folder, tainted.flows)
-        json_file_path = __analyze_method(output_folder, tainted)
+        json_file_path = __analyze_method(output_folder, tainted, priority_flow)
 
         # Claude 분석 실행
         __run_claude_analysis(priority_flow, output_folder, api_key)
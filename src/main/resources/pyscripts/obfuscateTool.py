@@ -4,6 +4,8 @@ import os
 import secrets
 import re
 
+from parallelParser import parse_java_folder
+
 
 class ObfuscateTool:
     def random_class(class_list, random_count):
@@ -18,65 +20,76 @@ class ObfuscateTool:
         with open(path, 'w', encoding='utf-8') as file:
             file.write(cleaned_code)
 
-    def parse_java_files(folder_path):
+    def parse_java_files(folder_path, workers=None):
         java_files = []
-        for root, _, files in os.walk(folder_path):
-            for file_name in files:
-                if file_name.endswith('.java'):
-                    file_path = os.path.join(root, file_name)
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        source_code = file.read()
-
-                    try:
-                        tree = javalang.parse.parse(source_code)
-                        java_files.append((file_path, tree, source_code))
-                    except SyntaxError as e:  # 문법 오류는 파이썬의 SyntaxError로 처리
-                        print(f"Syntax error in file {file_path}: {e}")
-                    except javalang.parser.JavaSyntaxError as e:
-                        print(f"Java syntax error in file {file_path}: {e}")
+        for file_path, source_code, tree, error in parse_java_folder(folder_path, workers):
+            if error is None:
+                java_files.append((file_path, tree, source_code))
+            elif isinstance(error, SyntaxError):  # 문법 오류는 파이썬의 SyntaxError로 처리
+                print(f"Syntax error in file {file_path}: {error}")
+            elif isinstance(error, javalang.parser.JavaSyntaxError):
+                print(f"Java syntax error in file {file_path}: {error}")
+            else:
+                raise error
 
         return java_files
 
-    def convert_unicode_literals(folder_path):
+    def convert_unicode_literals(folder_path, project=None):
+        if project is not None:  # 상주 워커가 들고 있는 소스를 바로 변환 (바뀐 것만 dirty 가 됨)
+            for unit in project.units:
+                unit.replace(ObfuscateTool.convert_unicode_source(unit.source))
+            return
+
         for root, _, files in os.walk(folder_path):
             for file_name in files:
                 if file_name.endswith('.java'):
                     file_path = os.path.join(root, file_name)
-                    content = None
                     with open(file_path, 'r', encoding='utf-8') as file:
                         content = file.read()
 
-                    # 문자열 리터럴 찾기
-                    string_literals = re.findall(r'"(.*?)"', content, re.DOTALL)
+                    converted = ObfuscateTool.convert_unicode_source(content)
+
+                    # 바뀐 파일만 덮어쓰기
+                    if converted != content:
+                        with open(file_path, 'w', encoding='utf-8') as file:
+                            file.write(converted)
+
+    def convert_unicode_source(content):
+        """문자열 리터럴(텍스트 블록 포함)의 ASCII 가 아닌 문자는 \\uXXXX 로, ASCII 범위의 \\uXXXX 이스케이프는
+        원래 문자로 바꿈 (주석, 문자 리터럴, 코드의 ASCII 가 아닌 문자는 그대로)"""
+        return _JAVA_TOKEN.sub(_convert_token, content)
+
 
-                    # 변환 결과를 저장할 리스트
-                    modified_strings = []
+# 주석, 텍스트 블록, 문자열/문자 리터럴 (닫히지 않으면 주석은 파일 끝, 리터럴은 줄 끝까지), 코드의 유니코드 이스케이프
+_JAVA_TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<text_block>"""(?:\\.|[^\\])*?(?:"""|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*(?:"|$))
+  | (?P<char>'(?:\\.|[^'\\\n])*(?:'|$))
+  | (?P<escape>\\+u+[0-9A-Fa-f]{4})
+''', re.S | re.M | re.X)
+_UNICODE_ESCAPE = re.compile(r'(\\+)u+([0-9A-Fa-f]{4})')
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
 
-                    for literal in string_literals:
-                        modified_literal = ''
-                        for char in literal:
-                            # Unicode 범위에 해당하는 경우 \u 형식으로 변환
-                            if ord(char) > 127:  # ASCII가 아닌 경우로 체크
-                                modified_literal += f'\\u{ord(char):04x}'
-                            else:
-                                modified_literal += char
-                        modified_strings.append(modified_literal)
 
-                    # 원래 내용에서 문자열 리터럴을 변환한 내용으로 대체
-                    for original, modified in zip(string_literals, modified_strings):
-                        content = content.replace(f'"{original}"', f'"{modified}"')
+def _convert_token(match):
+    token = _UNICODE_ESCAPE.sub(_ascii_escape, match.group())
+    if match.lastgroup in ('string', 'text_block'):
+        token = _NON_ASCII.sub(_unicode_escape, token)
+    return token
 
 
-                    pattern = r'\\u([0-9A-Fa-f]{4})'
-                    matches = re.findall(pattern, content)
+def _ascii_escape(match):
+    backslashes = match.group(1)
+    value = int(match.group(2), 16)
+    if len(backslashes) % 2 == 0 or value > 0x7F:  # 이스케이프된 역슬래시이거나 ASCII 가 아닌 문자
+        return match.group()
+    return backslashes[:-1] + chr(value)
 
-                    # ASCII 범위 확인 (0x00부터 0x7F까지가 ASCII 범위)
-                    for match in matches:
-                        hex_value = int(match, 16)  # 16진수를 정수로 변환
-                        if 0x00 <= hex_value <= 0x7F:
-                            content = content.replace(f'\\u{hex_value:04X}',chr(hex_value))
-                            content = content.replace(f'\\u{hex_value:04x}',chr(hex_value))
-                    # 변환된 내용을 파일에 덮어쓰기 (선택 사항)
-                    with open(file_path, 'w', encoding='utf-8') as file:
-                        file.write(content)
 
+def _unicode_escape(match):
+    code = ord(match.group())
+    if code > 0xFFFF:  # UTF-16 대리 쌍으로
+        code -= 0x10000
+        return f'\\u{0xD800 + (code >> 10):04x}\\u{0xDC00 + (code & 0x3FF):04x}'
+    return f'\\u{code:04x}'
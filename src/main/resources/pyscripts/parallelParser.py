@@ -0,0 +1,106 @@
+import os
+import pickle
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import javalang
+
+from astCache import ASTCache
+
+
+DEFAULT_WORKERS = int(os.environ.get('TAINTBOMB_PARSE_WORKERS', '0')) or (os.cpu_count() or 1)
+DEFAULT_CHUNK_SIZE = int(os.environ.get('TAINTBOMB_PARSE_CHUNK', '16'))
+MIN_PARALLEL_FILES = 32  # 이보다 적으면 프로세스를 띄우는 비용이 더 큼
+
+# error 는 파싱에 실패한 경우의 예외 객체 (SyntaxError 또는 javalang 파서 예외), 성공하면 None
+ParseResult = namedtuple("ParseResult", ["file_path", "source_code", "tree", "error"])
+
+
+def find_java_files(folder_path):
+    """os.walk 순서 그대로 .java 파일 경로를 수집"""
+    java_files = []
+    for root, _, files in os.walk(folder_path):
+        for file_name in files:
+            if file_name.endswith('.java'):
+                java_files.append(os.path.join(root, file_name))
+    return java_files
+
+
+def _parse_file(file_path, cache):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        source_code = file.read()
+    return _parse_source(file_path, source_code, cache)
+
+
+def _parse_source(file_path, source_code, cache):
+    try:
+        return ParseResult(file_path, source_code, cache.parse(source_code), None)
+    except (SyntaxError, javalang.parser.JavaParserBaseException) as e:
+        return ParseResult(file_path, source_code, None, e)
+
+
+def _parse_chunk(file_paths):
+    """워커 프로세스에서 파일 묶음을 파싱하고 캐시 통계 증가분을 함께 반환
+
+    트리는 워커에서 파일마다 미리 pickle 해서 보낸다. 깊게 중첩된 트리(긴 else if 사슬, 아주 긴 문자열
+    연결 등)는 pickle 할 때 RecursionError 가 나므로 None 으로 보내고 부모 프로세스에서 다시 파싱한다.
+    """
+    cache = ASTCache.shared()
+    hits, misses = cache.hits, cache.misses
+    results = []
+    for file_path in file_paths:
+        result = _parse_file(file_path, cache)
+        data = None
+        if result.error is None:
+            try:
+                data = pickle.dumps(result.tree, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, RecursionError):
+                pass
+        results.append((result.file_path, result.source_code, data, result.error))
+    return results, cache.hits - hits, cache.misses - misses
+
+
+def parse_files(file_paths, workers=None, chunk_size=None):
+    """파일들을 파싱해서 입력 순서대로 ParseResult 리스트를 반환
+
+    workers 가 1 이하이거나 파일 수가 적으면 현재 프로세스에서 순서대로 파싱하고,
+    그 외에는 chunk_size 개씩 묶어서 프로세스 풀에 나눠준다.
+    """
+    workers = DEFAULT_WORKERS if workers is None else workers
+    chunk_size = max(1, DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size)
+    cache = ASTCache.shared()
+
+    if workers <= 1 or len(file_paths) < MIN_PARALLEL_FILES:
+        return [_parse_file(file_path, cache) for file_path in file_paths]
+
+    # 상주 워커처럼 메모리에 트리를 들고 있으면 바뀌지 않은 파일은 풀에 보내지 않는다
+    parsed = {}
+    if cache.memory_limit:
+        for file_path in file_paths:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                source_code = file.read()
+            tree = cache.lookup(source_code)
+            if tree is not None:
+                parsed[file_path] = ParseResult(file_path, source_code, tree, None)
+
+    pending = [file_path for file_path in file_paths if file_path not in parsed]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    if chunks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            for chunk_results, hits, misses in executor.map(_parse_chunk, chunks):  # map 은 제출 순서대로 돌려준다
+                for file_path, source_code, data, error in chunk_results:
+                    if error is not None:
+                        parsed[file_path] = ParseResult(file_path, source_code, None, error)
+                    elif data is None:  # 워커에서 보낼 수 없던 트리
+                        parsed[file_path] = _parse_source(file_path, source_code, cache)
+                    else:
+                        parsed[file_path] = ParseResult(file_path, source_code, pickle.loads(data), None)
+                        cache.remember(source_code, parsed[file_path].tree)
+                cache.hits += hits
+                cache.misses += misses
+
+    return [parsed[file_path] for file_path in file_paths]
+
+
+def parse_java_folder(folder_path, workers=None, chunk_size=None):
+    return parse_files(find_java_files(folder_path), workers, chunk_size)
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+from astCache import ASTCache
+from project import Project
+
+
+MEMORY_ENTRIES = int(os.environ.get('TAINTBOMB_WORKER_MEMORY_ENTRIES', '10000'))
+
+
+def _check_java_syntax(args, worker):
+    from checkJavaSyntax import parse_java_files_in_directory
+    parse_java_files_in_directory(args[0])  # 원본 폴더를 읽기만 하므로 project 를 쓰지 않음
+
+
+def _remove_comments(args, worker):
+    from removeComments import RemoveComments
+    RemoveComments(args[0], worker.project(args[0]))
+
+
+def _string_obfuscate(args, worker):
+    from stringObfuscate import StringObfuscate
+    StringObfuscate(*args[:3], project=worker.project(args[0]))
+
+
+def _analysis(args, worker):
+    import main
+    main.main(args[0], args[1] if len(args) > 1 else None, worker.project(args[0]))
+
+
+def _level_obfuscate(args, worker):
+    from levelObfuscate import LevelObfuscation
+    LevelObfuscation(*args[:4], project=worker.project(args[0]))
+
+
+def _identifier_obfuscate(args, worker):
+    from identifierObfuscate import ob_identifier
+    ob_identifier(args[0], args[0], worker.project(args[0]))
+
+
+def _checkpoint(args, worker):
+    written = worker.checkpoint()
+    print(f"checkpoint: {written} files written")
+
+
+# 요청의 args 는 각 스크립트를 단독 실행할 때의 sys.argv[1:] 와 같다
+STAGES = {
+    'checkJavaSyntax': _check_java_syntax,
+    'removeComments': _remove_comments,
+    'stringObfuscate': _string_obfuscate,
+    'main': _analysis,
+    'levelObfuscate': _level_obfuscate,
+    'identifierObfuscate': _identifier_obfuscate,
+    'checkpoint': _checkpoint,
+}
+
+
+class _StageOutput(io.TextIOBase):
+    """단계 실행 중 print 출력을 줄 단위 log 이벤트로 바꿔서 보내는 스트림"""
+
+    def __init__(self, worker, request_id):
+        self.worker = worker
+        self.request_id = request_id
+        self.buffer = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.buffer += text
+        while '\n' in self.buffer:
+            line, self.buffer = self.buffer.split('\n', 1)
+            self.worker.send(id=self.request_id, event='log', line=line)
+        return len(text)
+
+    def close_line(self):
+        if self.buffer:
+            self.worker.send(id=self.request_id, event='log', line=self.buffer)
+            self.buffer = ''
+
+
+# 요청 (stdin, 한 줄에 JSON 하나)
+#     {"id": 1, "stage": "removeComments", "args": ["<outputFolder>"]}
+#     {"id": 2, "stage": "checkpoint"}  메모리의 소스를 디스크에 씀
+#     {"id": 3, "stage": "shutdown"}
+# 이벤트 (stdout, 한 줄에 JSON 하나)
+#     {"id": 1, "event": "log", "line": "..."}   단계가 출력한 내용
+#     {"id": 1, "event": "done", "exitCode": 0}  단계 종료 (예외나 exit() 는 0 이 아닌 코드)
+class PipelineWorker:
+    """파이프라인 단계를 한 인터프리터에서 요청 단위로 실행하는 상주 워커 (임포트, AST, Project 를 요청 사이에 유지)"""
+
+    def __init__(self, input_stream=None, output_stream=None):
+        self.input = input_stream or io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        self.output = output_stream or sys.stdout
+        self._project = None
+        ASTCache.shared().memory_limit = MEMORY_ENTRIES
+
+    def project(self, folder_path):
+        """folder_path 의 Project (다른 폴더를 요청하면 지금 것을 쓰고 새로 읽음)"""
+        if self._project is None or self._project.folder_path != folder_path:
+            self.checkpoint()
+            self._project = Project.load(folder_path)
+        return self._project
+
+    def checkpoint(self):
+        return self._project.checkpoint() if self._project is not None else 0
+
+    def send(self, **message):
+        self.output.write(json.dumps(message) + '\n')  # ASCII 로만 보내서 인코딩 문제를 피함
+        self.output.flush()
+
+    def serve(self):
+        for line in self.input:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.send(id=None, event='done', exitCode=2, error=f"invalid request: {e}")
+                continue
+
+            if request.get('stage') == 'shutdown':
+                request['stage'] = 'checkpoint'  # 남은 변경 사항을 쓰고 종료
+                self.handle(request)
+                break
+
+            self.handle(request)
+
+    def handle(self, request):
+        request_id = request.get('id')
+        stage = STAGES.get(request.get('stage'))
+        if stage is None:
+            self.send(id=request_id, event='done', exitCode=2, error=f"unknown stage: {request.get('stage')}")
+            return
+
+        stage_output = _StageOutput(self, request_id)
+        exit_code = 0
+        with redirect_stdout(stage_output), redirect_stderr(stage_output):
+            try:
+                stage(request.get('args', []), self)
+                ASTCache.shared().report()
+            except SystemExit as e:  # checkJavaSyntax 처럼 exit() 로 결과를 알리는 단계
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+        stage_output.close_line()
+
+        self.send(id=request_id, event='done', exitCode=exit_code)
+
+
+if __name__ == '__main__':
+    PipelineWorker().serve()
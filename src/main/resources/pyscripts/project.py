@@ -0,0 +1,172 @@
+import os
+
+import javalang
+
+from astCache import parse_java
+from parallelParser import parse_java_folder
+
+
+class CompilationUnit:
+    """Java 파일 하나의 소스, AST, 아직 적용하지 않은 편집 목록
+
+    edit() 로 쌓아 둔 편집은 source 를 읽을 때 한 번에 적용되고,
+    소스가 바뀌면 tree 는 다음에 접근할 때 다시 파싱된다.
+    """
+
+    def __init__(self, path, source_code, tree=None, error=None):
+        self.path = path
+        self.disk_path = path  # 마지막으로 디스크에 쓴(또는 읽은) 위치
+        self._source = source_code
+        self._tree = tree
+        self._error = error
+        self._parsed = tree is not None or error is not None
+        self._edits = []
+        self.dirty = False
+
+    @property
+    def source(self):
+        if self._edits:
+            self._apply_edits()
+        return self._source
+
+    @property
+    def tree(self):
+        """파싱에 실패하면 None (실패 원인은 error)"""
+        self._parse()
+        return self._tree
+
+    @property
+    def error(self):
+        self._parse()
+        return self._error
+
+    def _parse(self):
+        source = self.source
+        if self._parsed:
+            return
+        try:
+            self._tree, self._error = parse_java(source), None
+        except (SyntaxError, javalang.parser.JavaParserBaseException) as e:
+            self._tree, self._error = None, e
+        self._parsed = True
+
+    def edit(self, start, end, text):
+        """source[start:end] 를 text 로 바꾸는 편집 예약 (오프셋은 현재 source 기준)
+
+        같은 위치의 편집은 예약한 순서대로 적용된다.
+        """
+        self._edits.append((start, end, len(self._edits), text))
+
+    def _apply_edits(self):
+        parts = []
+        last = 0
+        for start, end, _, text in sorted(self._edits):
+            if start < last:
+                raise ValueError(f"overlapping edits in {self.path}: {start} < {last}")
+            parts.append(self._source[last:start])
+            parts.append(text)
+            last = end
+        parts.append(self._source[last:])
+
+        self._edits = []
+        self._set_source(''.join(parts))
+
+    def replace(self, source_code):
+        """소스 전체를 교체 (예약된 편집은 먼저 반영된 상태여야 하므로 적용 후 버림)"""
+        if self._edits:
+            self._apply_edits()
+        self._set_source(source_code)
+
+    def _set_source(self, source_code):
+        if source_code != self._source:
+            self._source = source_code
+            self._tree, self._error, self._parsed = None, None, False
+            self.dirty = True
+
+    def rename(self, new_path):
+        if new_path != self.path:
+            self.path = new_path
+            self.dirty = True
+
+
+class Project:
+    """파이프라인 단계들이 공유하는 메모리상의 Java 프로젝트
+
+    처음 load 할 때만 디스크에서 읽고, 각 단계는 CompilationUnit 의 소스를 고친다.
+    디스크에는 checkpoint()/flush() 를 호출할 때 바뀐 파일만 한 번에 쓴다.
+    """
+
+    def __init__(self, folder_path, units=()):
+        self.folder_path = folder_path
+        self.units = list(units)  # os.walk 순서 유지
+        self._index = {}
+
+    @classmethod
+    def load(cls, folder_path, workers=None):
+        units = [CompilationUnit(file_path, source_code, tree, error)
+                 for file_path, source_code, tree, error in parse_java_folder(folder_path, workers)]
+        return cls(folder_path, units)
+
+    def get(self, path):
+        unit = self._index.get(path)
+        if unit is None or unit.path != path:  # rename 이후면 색인을 다시 만든다
+            self._index = {unit.path: unit for unit in self.units}
+            unit = self._index.get(path)
+        return unit
+
+    def add(self, path, source_code):
+        """새 Java 파일 추가 (다음 checkpoint 때 디스크에 씀)"""
+        unit = CompilationUnit(path, source_code)
+        unit.dirty = True
+        self.units.append(unit)
+        self._index[path] = unit
+        return unit
+
+    def java_files(self):
+        """ObfuscateTool.parse_java_files 와 같은 (path, tree, source_code) 목록"""
+        java_files = []
+        for unit in self.units:
+            error = unit.error
+            if error is None:
+                java_files.append((unit.path, unit.tree, unit.source))
+            elif isinstance(error, SyntaxError):  # 문법 오류는 파이썬의 SyntaxError로 처리
+                print(f"Syntax error in file {unit.path}: {error}")
+            elif isinstance(error, javalang.parser.JavaSyntaxError):
+                print(f"Java syntax error in file {unit.path}: {error}")
+            else:
+                raise error
+
+        return java_files
+
+    def checkpoint(self):
+        """바뀐 파일만 디스크에 쓰고, 이름이 바뀐 파일은 이전 파일을 지운다"""
+        written = 0
+        for unit in self.units:
+            source = unit.source  # 예약된 편집이 있으면 먼저 반영
+            if not unit.dirty:
+                continue
+            os.makedirs(os.path.dirname(unit.path) or '.', exist_ok=True)
+            with open(unit.path, 'w', encoding='utf-8') as file:
+                file.write(source)
+            written += 1
+
+        current_paths = {unit.path for unit in self.units}
+        for unit in self.units:
+            if unit.disk_path != unit.path and unit.disk_path not in current_paths and os.path.exists(unit.disk_path):
+                os.remove(unit.disk_path)
+            unit.disk_path = unit.path
+            unit.dirty = False
+
+        return written
+
+    flush = checkpoint
+
+    @staticmethod
+    def open(folder_path, project=None):
+        """단계가 사용할 프로젝트와, 단계가 끝날 때 직접 flush 해야 하는지 여부를 반환
+
+        상주 워커가 넘겨준 project 가 있으면 그대로 쓰고, 단독 실행이면 디스크에서 읽는다.
+        """
+        if project is not None:
+            return project, False
+        return Project.load(folder_path), True
@@ -1,14 +1,16 @@
 from re import sub
 
-from obfuscateTool import ObfuscateTool
+from project import Project
 
 
 class RemoveComments:
-    def __init__(self, project_path):
+    def __init__(self, project_path, project=None):
         print("주석 제거 및 스타일 통일 작업 시작...")
 
-        java_files = ObfuscateTool.parse_java_files(project_path)
-        self.__process_file(java_files)
+        self.project, owns_project = Project.open(project_path, project)
+        self.__process_file(self.project.java_files())
+        if owns_project:
+            self.project.flush()
 
         print("주석 제거 및 스타일 통일 완료.")
 
@@ -17,7 +19,7 @@ class RemoveComments:
         for path, tree, source_code in java_files:
             cleaned_code = self.__remove_comments(source_code)
             formatted_code = self.__unify_brace_style(cleaned_code)
-            ObfuscateTool.overwrite_file(path, formatted_code)
+            self.project.get(path).replace(formatted_code)
             print(f"processed: {path}")
 
 
@@ -2,11 +2,22 @@ import os
 import base64
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
+from collections import namedtuple
 from keyObfuscate import KeyObfuscate
 
+
+# 프로젝트 전체 문자열 풀 (literals[i] 를 암호화한 것이 encrypted_literals[i])
+EncryptedPool = namedtuple("EncryptedPool", ["encrypted_aes_key", "enc_aes_key", "literals", "encrypted_literals"])
+
+
 class StringEncrypt:
-    def __init__(self,Literals):
-        self.encrypted_Literals = self.encrypt_string_literals(Literals)
+    def __init__(self,Literals, string_pool=False):
+        if string_pool:  # 같은 문자열은 프로젝트 전체에서 한 번만 암호화
+            self.encrypted_Literals = []
+            self.encrypted_pool = self.encrypt_string_pool(Literals)
+        else:
+            self.encrypted_Literals = self.encrypt_string_literals(Literals)
+            self.encrypted_pool = None
 
 
     def encrypt_string(self, plain_text, key):
@@ -17,21 +28,80 @@ class StringEncrypt:
         return base64.b64encode(encrypted_text).decode('utf-8')
 
 
-    # 암호화
-    def encrypt_string_literals(self, string_literals):
-        encrypted_Literals = []
+    def encrypt_strings(self, plain_texts, key):
+        """같은 키로 여러 문자열을 cipher 하나로 한 번에 암호화 (encrypt_string 을 각각 부른 것과 같은 결과)"""
+        padded_texts = [pad(plain_text.encode('utf-8'), AES.block_size) for plain_text in plain_texts]
+        encrypted = memoryview(AES.new(key, AES.MODE_ECB).encrypt(b''.join(padded_texts)))
+
+        encrypted_texts = []
+        offset = 0
+        for padded_text in padded_texts:
+            encrypted_texts.append(base64.b64encode(encrypted[offset:offset + len(padded_text)]).decode('utf-8'))
+            offset += len(padded_text)
+        return encrypted_texts
 
-        for p, c, strings,_ in string_literals:
-            aes_key = os.urandom(16)
-            enc_aes_key = os.urandom(8)
 
-            ko = KeyObfuscate(aes_key, enc_aes_key)
-            encrypted_aes_key = ko.enc_aes_key
+    def new_keys(self, count=None):
+        """AES 키와, KeyObfuscate 로 암호화한 AES 키 / 그 키의 base64 (count 를 주면 그 개수만큼의 목록)"""
+        if count is None:
+            return self.new_keys(1)[0]
 
+        random_keys = [(os.urandom(16), os.urandom(8)) for _ in range(count)]
+        encrypted_aes_keys = KeyObfuscate.encrypt_keys([aes_key for aes_key, _ in random_keys],
+                                                       [enc_aes_key for _, enc_aes_key in random_keys])
+
+        keys = []
+        for (aes_key, enc_aes_key), encrypted_aes_key in zip(random_keys, encrypted_aes_keys):
             enc_aes_key = base64.b64encode(enc_aes_key).decode('utf-8').replace("=","")
             encrypted_aes_key = base64.b64encode(encrypted_aes_key).decode('utf-8').replace("=","")
+            keys.append((aes_key, encrypted_aes_key, enc_aes_key))
+        return keys
+
+
+    # 암호화 (클래스마다 문자열들을 한 번에 암호화)
+    def encrypt_string_literals(self, string_literals):
+        encrypted_Literals = []
 
-            encrypted_Literals.append([p, c, encrypted_aes_key, enc_aes_key,[(self.encrypt_string(literal, aes_key), _) for literal, _ in strings],_])
+        keys = self.new_keys(len(string_literals))  # 모든 클래스의 키를 한 번에
+        for (p, c, strings,_), (aes_key, encrypted_aes_key, enc_aes_key) in zip(string_literals, keys):
+
+            encrypted_strings = self.encrypt_strings([literal for literal, _ in strings], aes_key)
+            encrypted_Literals.append([p, c, encrypted_aes_key, enc_aes_key,
+                                       [(encrypted, position) for encrypted, (literal, position) in zip(encrypted_strings, strings)], _])
 
         return encrypted_Literals
-    
+
+
+    def encrypt_string_pool(self, string_literals):
+        """모든 클래스의 문자열을 중복 없이 (처음 나온 순서) 한 키로 암호화"""
+        literals = list(dict.fromkeys(literal for p, c, strings, file_path in string_literals
+                                      for literal, position in sorted(strings, key=lambda x: (x[1][0], -x[1][1]))))
+        aes_key, encrypted_aes_key, enc_aes_key = self.new_keys()
+        return EncryptedPool(encrypted_aes_key, enc_aes_key, literals, self.encrypt_strings(literals, aes_key))
+
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    # 처리량 비교: python stringEncrypt.py [문자열 개수] [클래스당 문자열 개수]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    per_class = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    literals = [f'"literal {i} \\u00e9 {"x" * (i % 40)}"' for i in range(count)]
+    encryptor = StringEncrypt([])
+    key = os.urandom(16)
+
+    start = time.perf_counter()
+    single = [encryptor.encrypt_string(literal, key) for literal in literals]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = []
+    for i in range(0, count, per_class):
+        batch.extend(encryptor.encrypt_strings(literals[i:i + per_class], key))
+    batch_time = time.perf_counter() - start
+
+    assert single == batch, "batch encryption differs from per-literal encryption"
+    print(f"per literal: {count / single_time:,.0f} literals/s")
+    print(f"batch ({per_class}/class): {count / batch_time:,.0f} literals/s")
@@ -1,44 +1,115 @@
+import os
+
 import javalang
 
-from obfuscateTool import ObfuscateTool
+from collections import defaultdict
+
+
+STR_DECRYPT_IMPORTS = [
+    "import javax.crypto.Cipher;",
+    "import javax.crypto.SecretKey;",
+    "import javax.crypto.spec.SecretKeySpec;",
+    "import java.util.Base64;",
+    "import java.lang.reflect.Method;"
+    "import java.util.Random;"
+]
+
+KEY_DECRYPT_IMPORTS = [
+    "import java.security.MessageDigest;",
+    "import java.security.NoSuchAlgorithmException;",
+    "import java.util.ArrayList;",
+    "import java.util.Arrays;",
+    "import java.util.Base64;",
+    "import java.util.List;",
+    "import java.util.Random;"
+]
+
+REFLECTION_IMPORT = 'import java.lang.reflect.Method; import java.util.Random;'
+
+STRING_POOL_CLASS = 'StringPool'  # 문자열 풀 모드에서 만드는 클래스 이름 (이미 있으면 뒤에 번호)
+DECRYPTOR_HOLDER_CLASS = 'StringDecryptor'  # 리플렉션 Method 를 한 번만 찾아 두는 클래스 이름 (이미 있으면 뒤에 번호)
+
 
 class StringInsert:
-    def __init__(self, Literals, enc_Literals, class_names, foler_path, keyDecryptJava, stringDecryptJava):
-        self.Literals = Literals
-        self.enc_Literals = enc_Literals
+    """문자열 치환, 암호문 배열/static 블록, 복호화 클래스 삽입을 파일마다 원본 기준 오프셋 편집 한 번으로 하는 단계"""
+
+    def __init__(self, Literals, enc_Literals, class_names, foler_path, keyDecryptJava, stringDecryptJava, project,
+                 pool=None, lazy=False):
+        self.Literals = {file_path: (c, literals) for p, c, literals, file_path in Literals}
+        self.enc_Literals = {file_path: (c, encrypted_aes_key, enc_aes_key, literals)
+                             for p, c, encrypted_aes_key, enc_aes_key, literals, file_path in enc_Literals}
         self.classes = class_names
         self.foler_path = foler_path
+        self.project = project  # 단계마다 바뀐 소스는 디스크 대신 project 에 반영
 
         self.str_decrypt = self.classes[0]
         self.key_decrypt = self.classes[1]
 
-        print("replacing strings...")
-        self.__replace_strings()
-
-        print("inserting strings...")
-        self.__insert_string()
-
-        print("inserting decrypt functions...")
-        self.__insert_str_decrypt(stringDecryptJava) # 복호화 함수 넣기
-        self.__insert_key_decrypt(keyDecryptJava)
+        self.str_decryptor_code = self.__strip_imports(stringDecryptJava)
+        self.key_decryptor_code = self.__strip_imports(keyDecryptJava)
+
+        java_files = self.project.java_files()
+        self.lazy = lazy
+        self.pool = pool
+        if pool is not None:
+            self.pool_index = {literal: index for index, literal in enumerate(pool.literals)}
+            pool_path, pool_package, pool_name = self.__class_location(java_files, STRING_POOL_CLASS)
+            self.pool_class = f"{pool_package}.{pool_name}" if pool_package else pool_name
+        has_strings = pool is not None or bool(self.enc_Literals)
+        if has_strings:
+            holder_path, holder_package, holder_name = self.__class_location(java_files, DECRYPTOR_HOLDER_CLASS)
+            self.holder_class = f"{holder_package}.{holder_name}" if holder_package else holder_name
+
+        print("inserting strings and decrypt functions...")
+        for path, tree, source_code in java_files:
+            unit = self.project.get(path)
+            for start, end, text in self.file_edits(path, tree, source_code):
+                unit.edit(start, end, text)
+
+        if pool is not None:
+            self.project.add(pool_path, self.string_pool_class(pool_package, pool_name))
+            print(f"string pool : {len(pool.literals)} strings in {self.pool_class}")
+        if has_strings:
+            self.project.add(holder_path, self.decryptor_holder_class(holder_package, holder_name))
         print("to : ", self.str_decrypt)
         print("to : ", self.key_decrypt)
 
+    def __class_location(self, java_files, base_name):
+        """새로 만들 클래스(문자열 풀, 복호화 holder)의 파일 경로, 패키지, 이름 (실행마다 같도록 경로 순 첫 패키지)"""
+        packages = sorted((path, tree.package.name if tree.package else None) for path, tree, _ in java_files)
+        path, package = next((location for location in packages if location[1]),
+                             packages[0] if packages else (os.path.join(self.foler_path, ''), None))
+        folder = os.path.dirname(path)
+
+        name = base_name
+        number = 1
+        while self.project.get(os.path.join(folder, name + '.java')) is not None \
+                or os.path.exists(os.path.join(folder, name + '.java')):
+            name = f"{base_name}{number}"
+            number += 1
+        return os.path.join(folder, name + '.java'), package, name
+
+    @staticmethod
+    def __strip_imports(code):
+        return '\n'.join(line for line in code.split('\n') if not line.startswith('import'))
+
+    def file_edits(self, file_path, tree, code):
+        """파일 하나에 적용할 (시작, 끝, 텍스트) 편집 목록 (오프셋은 code 기준)"""
+        lines = code.split('\n')
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line) + 1)
 
-    def __insert_key_decrypt(self, key_decryptor_code):
-        java_files = ObfuscateTool.parse_java_files(self.foler_path) # insert 할때마다 position이 달라져서 여러번 하는중
-        for path,tree,source_code in java_files:
-            with open(path, 'w', encoding='utf-8') as file:
-                file.write(self.insert_key_decrypt(source_code, key_decryptor_code))
-
+        edits = []
+        inserts = []  # (줄 번호, 그 줄 뒤에 넣을 줄들) 을 넣은 순서대로
 
-    def insert_key_decrypt(self, code, key_decryptor_code):
-        tree = javalang.parse.parse(code)
-        lines = code.split('\n')
+        literal_class, literals = self.Literals.get(file_path, (None, None))
+        enc_class = self.enc_Literals.get(file_path, (None,))[0] if self.pool is None else None
+        array_line = None
+        str_lines, key_lines = [], []
         package_name = None
 
         for path, node in tree:
-
             if isinstance(node, javalang.tree.PackageDeclaration):
                 package_name = node.name
 
@@ -46,186 +117,174 @@ class StringInsert:
                 class_name = node.name
                 pos = node.position.line
 
-                if (self.key_decrypt[0] is None or self.key_decrypt[0] == package_name) and self.key_decrypt[1] == class_name:
-                    key_decryptor_code = key_decryptor_code.split('\n')
-                    key_decryptor_code = [line for line in key_decryptor_code if not line.startswith('import')]
-                    key_decryptor_code = '\n'.join(key_decryptor_code)
-
-
-                    lines.insert(pos,key_decryptor_code)
-
-
-                    import_statements = [
-                        "import java.security.MessageDigest;",
-                        "import java.security.NoSuchAlgorithmException;",
-                        "import java.util.ArrayList;",
-                        "import java.util.Arrays;",
-                        "import java.util.Base64;",
-                        "import java.util.List;",
-                        "import java.util.Random;"
-                    ]
-
-                    for import_statement in import_statements:
-                        if import_statement not in lines:
-                            lines.insert(1, import_statement)
-
-        code = '\n'.join(lines)
-
-        return code
-
-
-    def __insert_str_decrypt(self, key_decryptor_code): # 복호화 함수 넣기
-        java_files = ObfuscateTool.parse_java_files(self.foler_path) # insert 할때마다 position이 달라져서 여러번 하는중
-        for path,tree,source_code in java_files:
-            with open(path, 'w', encoding='utf-8') as file:
-                file.write(self.insert_str_decrypt(source_code, key_decryptor_code))
-
-
-    def insert_str_decrypt(self, code, key_decryptor_code):
-        tree = javalang.parse.parse(code)
-        lines = code.split('\n')
-        package_name = None
-        pos = None
-        for path, node in tree:
-
-            if isinstance(node, javalang.tree.PackageDeclaration):
-                package_name = node.name
-
-            if isinstance(node, javalang.tree.ClassDeclaration):
-                class_name = node.name
-                pos = node.position.line
+                if class_name == literal_class:
+                    edits.extend(self.replace_string_literals(literals, lines, line_starts))
+                    literal_class = None
+                if class_name == enc_class and array_line is None:
+                    array_line = pos
                 if (self.str_decrypt[0] is None or self.str_decrypt[0] == package_name) and self.str_decrypt[1] == class_name:
-
-                    key_decryptor_code = key_decryptor_code.split('\n')
-                    key_decryptor_code = [line for line in key_decryptor_code if not line.startswith('import')]
-                    key_decryptor_code = '\n'.join(key_decryptor_code)
-
-
-                    lines.insert(pos,key_decryptor_code)
-
-
-                    import_statements = [
-                        "import javax.crypto.Cipher;",
-                        "import javax.crypto.SecretKey;",
-                        "import javax.crypto.spec.SecretKeySpec;",
-                        "import java.util.Base64;",
-                        "import java.lang.reflect.Method;"
-                        "import java.util.Random;"
-                    ]
-
-                    for import_statement in import_statements:
-                        if import_statement not in lines:
-                            lines.insert(1, import_statement)
-
-
-        code = '\n'.join(lines)
-        return code
-
-
-    def __replace_strings(self):
-        java_files = ObfuscateTool.parse_java_files(self.foler_path)
-        for path,tree,source_code in java_files:
-            replaced_code = self.replace_string_literals(source_code,path)
-            ObfuscateTool.overwrite_file(path, replaced_code)
-
-
-    def replace_string_literals(self, code,file_path):
-        tree = javalang.parse.parse(code)
-        lines = code.split('\n')
-        for path, node in tree:
-            if isinstance(node, javalang.tree.PackageDeclaration):
-                package_name = node.name
-            if isinstance(node, javalang.tree.ClassDeclaration):
-                class_name = node.name
-                for p, c, literals,_ in self.Literals:
-                    if  c == class_name and file_path == _:
-                        literals_sorted = sorted(literals, key=lambda x: (x[1][0], -x[1][1]))  # 라인 오른쪽부터 문자열 변환
-                        for index, (literal, position) in enumerate(literals_sorted):
-                            line_index = position[0] - 1
-                            column_index = position[1] - 1
-
-                            line = lines[line_index]
-                            l_len = 0
-
-                            for char in literal:
-                                if ord(char) > 127: #유니코드일 경우
-                                    l_len += 6
-                                else:
-                                    l_len += 1
-
-                            end_column_index = column_index + l_len
-                            new_line = line[:column_index] + f'STRING_LITERALS[{index}]' + line[end_column_index:]
-                            lines[line_index] = new_line
-        code = '\n'.join(lines)
-
-        return code
-
-
-    # 여기서 반복문으로 소스코드 돌리면서 암호화 문자열 삽입
-    def __insert_string(self):
-        java_files = ObfuscateTool.parse_java_files(self.foler_path)
-        for path, tree, source_code in java_files:
-            inserted_code = self.insert_encrypted_string_array(source_code,path)
-            ObfuscateTool.overwrite_file(path, inserted_code)
-
-
-    def insert_encrypted_string_array(self, code,file_path):
-        tree = javalang.parse.parse(code)
-        package_name = None
-
-        array_declaration = []
-
-        classes_pos = []
-
-        key_declaration = None
-        key_declaration_list = []
-
-        for path, node in tree:
-            if isinstance(node, javalang.tree.PackageDeclaration):
-                package_name = node.name
-            if isinstance(node, javalang.tree.ClassDeclaration): # 근데 클래스 밖에있는 문자열, 다른클래스에서 특정 클래스의 문자열을 불러온다면?
-                class_name = node.name
-                for p,c,encrypted_aes_key,enc_aes_key,literals,_ in self.enc_Literals:
-                    if  c == class_name and _ == file_path: # 클래스 별 암호화된 문자열 삽입
-                        classes_pos.append(node.position[0])
-                        literals_sorted = sorted(literals, key=lambda x: (x[1][0], -x[1][1]))  # 라인 오른쪽부터 문자열 변환
-
-                        array_declaration.append(f'public static final String[] STRING_LITERALS = {{' + ','.join(f'"{literal}"' for literal,_ in literals_sorted) + '\n};\n')
-                        key_declaration = f'private static final String ENC_ENCRYPTION_KEY = "{encrypted_aes_key}";\n'
-                        key_declaration += f'private static final String ENCRYPTION_KEY = "{enc_aes_key}";\n'
-                        key_declaration_list.append(key_declaration)
-
-
-        lines = code.split('\n')
-        classes_pos = sorted(classes_pos, key=lambda x: (x, -x))  # 아래 클래스부터 추가
-
-        array_declaration = list(reversed(array_declaration)) if len(array_declaration) > 1 else array_declaration
-        key_declaration_list = list(reversed(key_declaration_list))if len(key_declaration_list) > 1 else key_declaration_list
-
+                    str_lines.append(pos)
+                if (self.key_decrypt[0] is None or self.key_decrypt[0] == package_name) and self.key_decrypt[1] == class_name:
+                    key_lines.append(pos)
+
+        # 클래스 별 암호화된 문자열 배열과 복호화 static 블록, 그리고 모든 파일에 리플렉션/Random import
+        # (Random 은 뒤의 더미 코드 삽입 단계가 쓴다)
+        if array_line is not None:
+            inserts.append((array_line, self.encrypted_string_array(self.enc_Literals[file_path])))
+        present = set(lines)
+        if REFLECTION_IMPORT not in present:
+            inserts.append((1, [REFLECTION_IMPORT]))
+
+        # 복호화 함수를 고른 클래스에 넣고, 없는 import 는 첫 줄 뒤에 추가
+        for class_lines, decryptor_code, import_statements in ((str_lines, self.str_decryptor_code, STR_DECRYPT_IMPORTS),
+                                                                (key_lines, self.key_decryptor_code, KEY_DECRYPT_IMPORTS)):
+            for pos in class_lines:
+                inserts.append((pos, [decryptor_code]))
+                present.update(decryptor_code.split('\n'))
+                for import_statement in import_statements:
+                    if import_statement not in present:
+                        present.add(import_statement)
+                        inserts.append((1, [import_statement]))
+
+        by_line = defaultdict(list)
+        for pos, new_lines in reversed(inserts):  # 나중에 넣은 것이 그 줄 바로 뒤에 온다
+            by_line[pos].extend(new_lines)
+        for pos, new_lines in by_line.items():
+            if pos < len(lines):
+                edits.append((line_starts[pos], line_starts[pos], '\n'.join(new_lines) + '\n'))
+            else:  # 마지막 줄 뒤
+                edits.append((len(code), len(code), '\n' + '\n'.join(new_lines)))
+
+        return edits
+
+    def replace_string_literals(self, literals, lines, line_starts):
+        """문자열 리터럴을 STRING_LITERALS[index] (풀 모드면 StringPool.STRING_LITERALS[풀 index]) 로 바꾸는 편집"""
+        edits = []
+        literals_sorted = sorted(literals, key=lambda x: (x[1][0], -x[1][1]))
+        next_start = None  # 같은 줄에서 오른쪽에 있는 리터럴의 시작 열
+        for index, (literal, position) in enumerate(literals_sorted):  # 줄마다 오른쪽 리터럴부터
+            line_index = position[0] - 1
+            column_index = position[1] - 1
+            line = lines[line_index]
+
+            l_len = 0
+            for char in literal:
+                if ord(char) > 127:  # 유니코드일 경우
+                    l_len += 6
+                else:
+                    l_len += 1
+
+            end_column_index = min(column_index + l_len, len(line))
+            if next_start is not None and next_start[0] == line_index:
+                end_column_index = min(end_column_index, next_start[1])
+            column_index = min(column_index, end_column_index)
+            next_start = (line_index, column_index)
+
+            slot = index if self.pool is None else self.pool_index[literal]
+            reference = f'STRING_LITERAL({slot})' if self.lazy else f'STRING_LITERALS[{slot}]'
+            if self.pool is not None:
+                reference = f'{self.pool_class}.{reference}'
+            edits.append((line_starts[line_index] + column_index, line_starts[line_index] + end_column_index, reference))
+        return edits
+
+    def encrypted_string_array(self, encrypted):
+        """암호문 배열, 키 선언, 복호화 static 블록 또는 접근 함수 (클래스 선언 줄 뒤에 넣을 세 항목)"""
+        class_name, encrypted_aes_key, enc_aes_key, literals = encrypted
+        literals_sorted = sorted(literals, key=lambda x: (x[1][0], -x[1][1]))  # 치환한 순서와 같은 index
+        return self.__string_array(encrypted_aes_key, enc_aes_key, [literal for literal, _ in literals_sorted])
+
+    def string_pool_class(self, package, name):
+        """문자열 풀 클래스 소스 (배열, 키, 복호화 static 블록 또는 접근 함수를 클래스 하나에)"""
+        header = f"package {package};\n\n" if package else ""
+        members = '\n'.join(self.__string_array(self.pool.encrypted_aes_key, self.pool.enc_aes_key,
+                                                 self.pool.encrypted_literals))
+        return f"{header}public final class {name} {{\n{members}\n}}\n"
+
+    def decryptor_holder_class(self, package, name):
+        """복호화 함수의 Method 를 한 번만 찾아 두는 클래스 소스
+        (찾을 때 복호화 함수가 있는 클래스를 초기화하면 순환 초기화로 그 클래스의 문자열이 복호화되지 않음)"""
+        header = f"package {package};\n\n" if package else ""
         key_decrypt_class = f"{self.key_decrypt[0]}.{self.key_decrypt[1]}" if self.key_decrypt[0] else f"{self.key_decrypt[1]}"
         str_decrypt_class = f"{self.str_decrypt[0]}.{self.str_decrypt[1]}" if self.str_decrypt[0] else f"{self.str_decrypt[1]}"
-
+        return f"""{header}import java.lang.reflect.Method;
+
+public final class {name} {{
+    private static final Method KEY_DECRYPT;
+    private static final Method STRING_DECRYPT;
+    private static final Method STRING_DECRYPT_ALL;
+
+    static {{
+        Method keyDecrypt = null;
+        Method stringDecrypt = null;
+        Method stringDecryptAll = null;
+        try {{
+            ClassLoader loader = {name}.class.getClassLoader();
+            keyDecrypt = Class.forName("{key_decrypt_class}", false, loader).getMethod("keyDecrypt", String.class, String.class);
+            Class<?> decryptorClass = Class.forName("{str_decrypt_class}", false, loader);
+            stringDecrypt = decryptorClass.getMethod("stringDecrypt", String.class, byte[].class);
+            stringDecryptAll = decryptorClass.getMethod("stringDecryptAll", String[].class, byte[].class);
+        }} catch (Exception e) {{}}
+        KEY_DECRYPT = keyDecrypt;
+        STRING_DECRYPT = stringDecrypt;
+        STRING_DECRYPT_ALL = stringDecryptAll;
+    }}
+
+    private {name}() {{}}
+
+    public static byte[] key(String encryptedKey, String key) throws Exception {{
+        return (byte[]) KEY_DECRYPT.invoke(null, encryptedKey, key);
+    }}
+
+    public static String decrypt(String encryptedText, byte[] key) throws Exception {{
+        return (String) STRING_DECRYPT.invoke(null, encryptedText, key);
+    }}
+
+    public static void decryptAll(String[] encryptedTexts, byte[] key) throws Exception {{
+        STRING_DECRYPT_ALL.invoke(null, encryptedTexts, key);
+    }}
+}}
+"""
+
+    def __string_array(self, encrypted_aes_key, enc_aes_key, encrypted_literals):
+        array_declaration = f'public static final String[] STRING_LITERALS = {{' + ','.join(f'"{literal}"' for literal in encrypted_literals) + '\n};\n'
+        key_declaration = f'private static final String ENC_ENCRYPTION_KEY = "{encrypted_aes_key}";\n'
+        key_declaration += f'private static final String ENCRYPTION_KEY = "{enc_aes_key}";\n'
+
+        if self.lazy:
+            return [array_declaration, key_declaration, self.__lazy_accessor()]
+
+        # 키는 클래스마다 한 번만 풀고, 배열 전체를 Cipher 하나로 복호화
         decrypt_code = f"""        
-             static{{try {{Class<?> decryptorClass1 = Class.forName("{key_decrypt_class}");
-             Method decryptMethod1 = decryptorClass1.getMethod("keyDecrypt", String.class, String.class);
-             Class<?> decryptorClass2 = Class.forName("{str_decrypt_class}");
-             Method decryptMethod2 = decryptorClass2.getMethod("stringDecrypt", String.class, byte[].class);
-             for (int i = 0; i < STRING_LITERALS.length; i++) 
-            {{STRING_LITERALS[i] = (String) decryptMethod2.invoke(null, STRING_LITERALS[i], (byte[]) decryptMethod1.invoke(null,ENC_ENCRYPTION_KEY,ENCRYPTION_KEY)); 
-             }}}} catch (Exception e) {{}}}}
+             static{{try {{{self.holder_class}.decryptAll(STRING_LITERALS, {self.holder_class}.key(ENC_ENCRYPTION_KEY, ENCRYPTION_KEY));
+             }} catch (Exception e) {{}}}}
          """
 
-        for i,pos in enumerate(classes_pos):
-            # print("pos : ", pos)
-            # print("array_declaration : ", array_declaration[i])
-            lines.insert(pos,array_declaration[i])
-            lines.insert(pos+1,key_declaration_list[i])
-            lines.insert(pos+2,decrypt_code)
-
-        reflection = 'import java.lang.reflect.Method; import java.util.Random;'
-        if reflection not in lines:
-            lines.insert(1, reflection)
-
-        code = '\n'.join(lines)
-
-        return code
\ No newline at end of file
+        return [array_declaration, key_declaration, decrypt_code]
+
+    def __lazy_accessor(self):
+        """처음 접근할 때 한 칸만 복호화해서 캐시하는 STRING_LITERAL(index) (키는 중첩 클래스에서 한 번만 구함)"""
+        return f"""
+    private static final String[] STRING_CACHE = new String[STRING_LITERALS.length];
+    private static final class StringKey {{
+        static final byte[] KEY;
+        static {{
+            byte[] key = null;
+            try {{
+                key = {self.holder_class}.key(ENC_ENCRYPTION_KEY, ENCRYPTION_KEY);
+            }} catch (Exception e) {{}}
+            KEY = key;
+        }}
+    }}
+    public static String STRING_LITERAL(int index) {{
+        String value = STRING_CACHE[index];
+        if (value == null) {{
+            try {{
+                value = {self.holder_class}.decrypt(STRING_LITERALS[index], StringKey.KEY);
+            }} catch (Exception e) {{
+                return STRING_LITERALS[index];
+            }}
+            STRING_CACHE[index] = value;
+        }}
+        return value;
+    }}
+"""
@@ -1,23 +1,39 @@
+import os
+
 from stringSearch import StringSearch
 from stringEncrypt import StringEncrypt
 from stringInsert import StringInsert
 
 from obfuscateTool import ObfuscateTool
+from project import Project
+
+
+# 같은 문자열을 프로젝트 전체에서 한 번만 암호화해서 공유 클래스 하나에 두는 모드 (기본값은 클래스별 배열)
+STRING_POOL_ENABLED = os.environ.get('TAINTBOMB_STRING_POOL', '0') == '1'
+# 클래스 초기화 때 모두 복호화하지 않고 문자열을 처음 쓸 때 복호화하는 모드 (기본값은 static 블록에서 모두 복호화)
+STRING_LAZY_ENABLED = os.environ.get('TAINTBOMB_STRING_LAZY', '0') == '1'
 
 
 class StringObfuscate:
-    def __init__(self, output_folder, keyDecryptJava, stringDecryptJava):
-        searched_strings = StringSearch(output_folder)
+    def __init__(self, output_folder, keyDecryptJava, stringDecryptJava, project=None, string_pool=STRING_POOL_ENABLED,
+                 lazy=STRING_LAZY_ENABLED):
+        project, owns_project = Project.open(output_folder, project)
+
+        searched_strings = StringSearch(output_folder, project)
         print("string search complete")
 
-        encrypted_strings = StringEncrypt(searched_strings.Literals)
+        encrypted_strings = StringEncrypt(searched_strings.Literals, string_pool)
         print("string encrypt complete")
 
         random_classes = ObfuscateTool.random_class(searched_strings.class_names, 2)
         StringInsert(searched_strings.Literals, encrypted_strings.encrypted_Literals, random_classes, output_folder,
-                     keyDecryptJava, stringDecryptJava)
+                     keyDecryptJava, stringDecryptJava, project, encrypted_strings.encrypted_pool,
+                     lazy)
         print("string insert complete")
 
+        if owns_project:
+            project.flush()
+
 
 if __name__ == '__main__':
     import sys
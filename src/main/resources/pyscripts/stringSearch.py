@@ -6,16 +6,16 @@ from collections import defaultdict,namedtuple
 Position = namedtuple("Position", ["line", "column"]) # Postion 정의
 
 class StringSearch:
-    def __init__(self, java_folder_path):
+    def __init__(self, java_folder_path, project=None):
         self.class_names = []
         self.ban_list = []
         self.value_map = {}
 
 
         print("converting unicode...")
-        ObfuscateTool.convert_unicode_literals(java_folder_path)
+        ObfuscateTool.convert_unicode_literals(java_folder_path, project)
         print("parsing strings...")
-        trees = ObfuscateTool.parse_java_files(java_folder_path)
+        trees = project.java_files() if project is not None else ObfuscateTool.parse_java_files(java_folder_path)
         print("extracting strings...")
         self.Literals = self.__extract_string_literals(trees)  # [package,class,[Literals,,]] 이렇게 넣을 예정
 
@@ -0,0 +1,88 @@
+package io.JoJoonBalSsa.TaintBomb
+
+import org.junit.Assert.assertArrayEquals
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Assume.assumeTrue
+import org.junit.Test
+import java.io.File
+import java.lang.reflect.Method
+import java.net.URLClassLoader
+import java.nio.file.Files
+import java.util.Base64
+import java.util.concurrent.TimeUnit
+import javax.tools.ToolProvider
+
+// keyObfuscate.py 의 TEST_VECTORS 를 삽입되는 keyDecrypt.java 로 되돌려 보고, 파이썬 자체 검사도 실행
+class KeyDecryptTest {
+    private val keyObfuscatePy = File("src/main/resources/pyscripts/keyObfuscate.py")
+    private val keyDecryptJava = File("src/main/resources/java/keyDecrypt.java")
+
+    @Test
+    fun testKeyDecryptJavaReversesPythonVectors() {
+        val keyDecrypt = compileKeyDecrypt()
+        val vectors = readVectors()
+        assertTrue("no TEST_VECTORS in $keyObfuscatePy", vectors.isNotEmpty())
+
+        for ((aesKey, encKey, encrypted) in vectors) {
+            val base64 = Base64.getEncoder()
+            val decrypted = keyDecrypt.invoke(null, base64.encodeToString(hex(encrypted)), base64.encodeToString(hex(encKey))) as ByteArray
+            // KeyObfuscate 는 16바이트 단위로 0 을 채우고, keyDecrypt 는 끝의 0 을 지움
+            assertArrayEquals("vector $aesKey / $encKey", hex(aesKey).dropLastWhile { it == 0.toByte() }.toByteArray(), decrypted)
+        }
+    }
+
+    @Test
+    fun testKeyObfuscateSelfCheck() {
+        val python = listOf("python3", "python").firstOrNull { runsPython(it) }
+        assumeTrue("no Python interpreter on PATH", python != null)
+
+        val process = ProcessBuilder(python!!, keyObfuscatePy.path, "100").redirectErrorStream(true).start()
+        val output = process.inputStream.bufferedReader().readText()
+        assertTrue("keyObfuscate.py timed out", process.waitFor(120, TimeUnit.SECONDS))
+        assertEquals(output, 0, process.exitValue())
+    }
+
+    private fun compileKeyDecrypt(): Method {
+        val compiler = ToolProvider.getSystemJavaCompiler()
+        assumeTrue("no Java compiler in the test JVM", compiler != null)
+
+        // stringInsert.py 의 KEY_DECRYPT_IMPORTS 와 같이 클래스 안에 넣어 컴파일
+        val dir = Files.createTempDirectory("keyDecrypt").toFile()
+        val source = File(dir, "KeyDecryptHost.java")
+        source.writeText(
+            """
+            import java.security.NoSuchAlgorithmException;
+            import java.util.ArrayList;
+            import java.util.Arrays;
+            import java.util.Base64;
+            import java.util.List;
+
+            public class KeyDecryptHost {
+            ${keyDecryptJava.readText()}
+            }
+            """.trimIndent()
+        )
+        assertEquals("keyDecrypt.java does not compile", 0, compiler.run(null, null, null, "-d", dir.path, source.path))
+
+        val loader = URLClassLoader(arrayOf(dir.toURI().toURL()), javaClass.classLoader)
+        return loader.loadClass("KeyDecryptHost").getMethod("keyDecrypt", String::class.java, String::class.java)
+    }
+
+    private fun readVectors(): List<Triple<String, String, String>> {
+        val block = keyObfuscatePy.readText().substringAfter("TEST_VECTORS = [").substringBefore("\n]")
+        return Regex("""\(\s*'([0-9a-f]+)',\s*'([0-9a-f]+)',\s*'([0-9a-f]+)'\s*\)""").findAll(block)
+            .map { Triple(it.groupValues[1], it.groupValues[2], it.groupValues[3]) }
+            .toList()
+    }
+
+    private fun hex(value: String): ByteArray =
+        ByteArray(value.length / 2) { value.substring(it * 2, it * 2 + 2).toInt(16).toByte() }
+
+    private fun runsPython(command: String): Boolean = try {
+        val process = ProcessBuilder(command, "--version").redirectErrorStream(true).start()
+        process.waitFor(10, TimeUnit.SECONDS) && process.exitValue() == 0
+    } catch (e: Exception) {
+        false
+    }
+}